@@ -1,119 +1,610 @@
 import os
+import sys
 import numpy as np
 import pandas as pd
 import uuid
 import json
 import hashlib
 import secrets
-from datetime import datetime, timedelta
-from flask import Flask, request, render_template_string, redirect, url_for, flash, session, jsonify
+import re
+import queue
+import sqlite3
+import threading
+import time
+import atexit
+import gzip
+import logging
+from logging.handlers import QueueHandler, QueueListener, WatchedFileHandler
+from bisect import bisect_right
+from collections import deque, namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import timedelta
+from flask import Flask, Response, request, render_template, redirect, url_for, flash, session, jsonify, g
+from flask.json.provider import DefaultJSONProvider
 from werkzeug.utils import secure_filename
+from jinja2 import ChoiceLoader, DictLoader, FileSystemLoader, FileSystemBytecodeCache
 from PIL import Image
 import tensorflow as tf
-from tensorflow.keras.applications.mobilenet_v2 import MobileNetV2, preprocess_input, decode_predictions
-from tensorflow.keras.preprocessing.image import img_to_array
+from tensorflow.keras.applications.mobilenet_v2 import MobileNetV2, decode_predictions
 from functools import wraps
+from itertools import accumulate
+
+try:
+    import orjson  # optional: C JSON encoder/decoder, falls back to stdlib json
+except ImportError:
+    orjson = None
+
+try:
+    import pyarrow.csv as pacsv  # optional: multithreaded CSV parser, falls back to pandas
+except ImportError:
+    pacsv = None
+
+try:
+    from passlib.context import CryptContext  # argon2id password hashing, falls back to scrypt if missing
+    from passlib.hash import argon2 as passlib_argon2
+except ImportError:
+    CryptContext = passlib_argon2 = None
+
+try:
+    import brotli  # optional: brotli-compressed static pages, falls back to gzip
+except ImportError:
+    brotli = None
+
+try:
+    import redis
+    from flask_session import Session  # optional: server-side sessions, falls back to signed cookies
+except ImportError:
+    redis = Session = None
+
+try:
+    from flask_compress import Compress  # optional: br/gzip for rendered pages, falls back to uncompressed
+except ImportError:
+    Compress = None
 
 # ==========================================
 # 1. CONFIGURATION & SETUP
 # ==========================================
 
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask's JSON (jsonify, the |tojson filter) encoded and parsed by orjson"""
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
 app.secret_key = "super_secret_key_epc_system_2025"
+if orjson:
+    app.json = OrjsonProvider(app)
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=24)
 
+# Set EPC_SESSION_REDIS (e.g. redis://localhost:6379/0) to keep sessions in Redis,
+# shared by every worker process, instead of in the signed cookie
+SESSION_REDIS_URL = os.environ.get('EPC_SESSION_REDIS')
+if SESSION_REDIS_URL:
+    if Session:
+        app.config['SESSION_TYPE'] = 'redis'
+        app.config['SESSION_REDIS'] = redis.Redis(
+            connection_pool=redis.BlockingConnectionPool.from_url(SESSION_REDIS_URL, max_connections=32)
+        )
+        Session(app)
+    else:
+        print("⚠️ EPC_SESSION_REDIS is set but flask-session/redis are not installed, using cookie sessions")
+
+# Compress rendered HTML/JSON over 1KB at a fast per-request level. Pages from
+# static_page() already carry Content-Encoding and are passed through untouched.
+if Compress:
+    app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+    app.config['COMPRESS_MIN_SIZE'] = 1024
+    app.config['COMPRESS_LEVEL'] = 6
+    app.config['COMPRESS_BR_LEVEL'] = 4
+    Compress(app)
+
 # Folder setup
 DATASETS_FOLDER = 'datasets'
 UPLOAD_FOLDER = 'static/uploads'
-USERS_FILE = 'users.json'
-LOGS_FILE = 'logs.json'
+USERS_DB = 'users.db'
+USERS_FILE = 'users.json'  # legacy store, imported into USERS_DB on first start
+LOGS_FILE = 'logs.jsonl'
+LEGACY_LOGS_FILE = 'logs.json'
+MAX_LOGS = 1000
+IO_BUFFER_SIZE = 1 << 20  # 1MB buffers for uploads and log files
+MODELS_FOLDER = 'models'
+# CPUs available to this process: gunicorn_config.py exports its worker count as
+# WEB_CONCURRENCY, so the per-process thread pools split the machine between workers
+WORKER_CPUS = max(1, (os.cpu_count() or 1) // max(1, int(os.environ.get('WEB_CONCURRENCY', 1))))
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB
 
 # Create necessary directories
 os.makedirs(DATASETS_FOLDER, exist_ok=True)
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+os.makedirs(MODELS_FOLDER, exist_ok=True)
+
+# Third-party CSS/JS is vendored under static/vendor/<name>-<version>/, so a
+# file's URL changes whenever its content does and browsers may keep it forever
+VENDOR_MAX_AGE = 365 * 24 * 3600
+
+@app.after_request
+def cache_vendor_assets(response):
+    """Long-lived, immutable caching for vendored static assets"""
+    if request.path.startswith('/static/vendor/') and response.status_code in (200, 304):
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = VENDOR_MAX_AGE
+        response.cache_control.immutable = True
+    return response
 
 # ==========================================
 # 2. USER AUTHENTICATION SYSTEM
 # ==========================================
 
-def load_users():
-    """Load users from JSON file"""
-    if os.path.exists(USERS_FILE):
-        try:
-            with open(USERS_FILE, 'r') as f:
-                return json.load(f)
-        except:
-            return {}
-    return {}
+_TIMESTAMP = (None, '')  # (epoch second, its formatted string), swapped atomically
+
+def timestamp():
+    """Current local time as 'YYYY-MM-DD HH:MM:SS', formatted at most once per second"""
+    global _TIMESTAMP
+    second = int(time.time())
+    cached_second, formatted = _TIMESTAMP
+    if second != cached_second:
+        formatted = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(second))
+        _TIMESTAMP = (second, formatted)
+    return formatted
+
+def json_dumps(obj):
+    """Serialize to compact UTF-8 JSON bytes"""
+    if orjson:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def json_loads(data):
+    """Parse JSON from bytes or str"""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def to_float(value):
+    """float() for loosely typed product fields, 0.0 if missing or malformed"""
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+# Users live in SQLite (WAL mode): lookups and updates touch one row by primary key.
+# Search history and upload counters have their own tables, so the account row
+# stays small and fixed-size however much a user searches.
+USERS_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS users (
+    email TEXT PRIMARY KEY,
+    username TEXT NOT NULL,
+    password TEXT NOT NULL,
+    full_name TEXT,
+    role TEXT NOT NULL DEFAULT 'user',
+    created_at TEXT,
+    last_login TEXT
+);
+CREATE TABLE IF NOT EXISTS searches (
+    id INTEGER PRIMARY KEY,
+    email TEXT NOT NULL,
+    timestamp TEXT,
+    category TEXT,
+    keywords TEXT,
+    matches_count INTEGER,
+    image TEXT
+);
+CREATE INDEX IF NOT EXISTS searches_by_email ON searches (email, id);
+CREATE TABLE IF NOT EXISTS upload_counts (
+    email TEXT PRIMARY KEY,
+    count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS search_results (
+    email TEXT PRIMARY KEY,
+    token TEXT NOT NULL UNIQUE,
+    prediction TEXT,
+    image_url TEXT,
+    best_price REAL,
+    matches BLOB
+);
+CREATE TABLE IF NOT EXISTS user_stats (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    total INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO user_stats (id, total) SELECT 0, COUNT(*) FROM users;
+CREATE TRIGGER IF NOT EXISTS user_stats_insert AFTER INSERT ON users
+BEGIN UPDATE user_stats SET total = total + 1 WHERE id = 0; END;
+CREATE TRIGGER IF NOT EXISTS user_stats_delete AFTER DELETE ON users
+BEGIN UPDATE user_stats SET total = total - 1 WHERE id = 0; END;
+'''
+# One compiled pass to reject malformed emails before any database or hashing work
+# (domain labels exclude dots, so matching stays linear on hostile input)
+EMAIL_RE = re.compile(r'[^@\s]+@[^@\s.]+(?:\.[^@\s.]+)+')
+USER_COLUMNS = ('username', 'password', 'full_name', 'role', 'created_at', 'last_login')
+SEARCH_COLUMNS = ('timestamp', 'category', 'keywords', 'matches_count', 'image')
+MAX_SEARCHES = 50  # history kept per user
+_DB_LOCAL = threading.local()
+
+def get_db():
+    """SQLite connection for the current thread, opened once and reused"""
+    conn = getattr(_DB_LOCAL, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(USERS_DB, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        _DB_LOCAL.conn = conn
+    return conn
+
+def _users_cache():
+    """Per-thread cache of user rows and counts, dropped when another connection commits"""
+    # data_version only changes for commits made by *other* connections;
+    # this thread's own writes call _invalidate_users_cache() instead
+    version = get_db().execute('PRAGMA data_version').fetchone()[0]
+    cache = getattr(_DB_LOCAL, 'cache', None)
+    if cache is None or cache['version'] != version:
+        cache = _DB_LOCAL.cache = {'version': version, 'users': {}, 'count': None}
+    return cache
+
+def _invalidate_users_cache():
+    """Forget this thread's cached rows after it writes"""
+    _DB_LOCAL.cache = None
+
+def get_user(email):
+    """Return a user's account fields as a dict, or None if not registered"""
+    users = _users_cache()['users']
+    if email not in users:
+        row = get_db().execute(
+            f"SELECT {', '.join(USER_COLUMNS)} FROM users WHERE email = ?", (email,)
+        ).fetchone()
+        if not row:
+            return None
+        users[email] = dict(row)
+    return users[email]
+
+def create_user(email, user):
+    """Insert a new user; False if the email is already registered"""
+    # Fields missing from older records fall back to the column defaults
+    columns = [c for c in USER_COLUMNS if user.get(c) is not None]
+    try:
+        with get_db() as conn:
+            conn.execute(
+                f"INSERT INTO users (email, {', '.join(columns)}) VALUES (?, {', '.join('?' * len(columns))})",
+                (email, *(user[c] for c in columns))
+            )
+    except sqlite3.IntegrityError:
+        return False
+    finally:
+        _invalidate_users_cache()
+    return True
+
+def update_user(email, **fields):
+    """Update the given account fields of one user"""
+    assert set(fields) <= set(USER_COLUMNS), fields
+    with get_db() as conn:
+        conn.execute(
+            f"UPDATE users SET {', '.join(f'{c} = ?' for c in fields)} WHERE email = ?",
+            (*fields.values(), email)
+        )
+    _invalidate_users_cache()
+
+def get_user_searches(email):
+    """Return a user's search history, oldest first"""
+    rows = get_db().execute(
+        f"SELECT {', '.join(SEARCH_COLUMNS)} FROM searches WHERE email = ? ORDER BY id", (email,)
+    ).fetchall()
+    return [dict(row) for row in rows]
+
+def _insert_searches(conn, email, searches):
+    """Append searches to a user's history and drop all but the newest MAX_SEARCHES"""
+    conn.executemany(
+        f"INSERT INTO searches (email, {', '.join(SEARCH_COLUMNS)}) VALUES (?, {', '.join('?' * len(SEARCH_COLUMNS))})",
+        [(email, *(search.get(c) for c in SEARCH_COLUMNS)) for search in searches]
+    )
+    conn.execute(
+        "DELETE FROM searches WHERE email = ? AND id <= "
+        "(SELECT id FROM searches WHERE email = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+        (email, email, MAX_SEARCHES)
+    )
+
+def record_upload_search(email, search, result):
+    """Count an upload, append its search and keep its results page, all in one
+    transaction (a single commit). Returns the token the results page is read by."""
+    token = secrets.token_urlsafe(12)
+    with get_db() as conn:
+        _add_upload(conn, email, 1)
+        _insert_searches(conn, email, [search])
+        # Only each user's latest results are kept
+        conn.execute(
+            "INSERT OR REPLACE INTO search_results (email, token, prediction, image_url, best_price, matches) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (email, token, result['prediction'], result['image_url'], result['best_price'],
+             json_dumps(result['matches']))
+        )
+    return token
+
+def get_search_result(token):
+    """Results page saved by record_upload_search, or None for an unknown token"""
+    row = get_db().execute(
+        "SELECT prediction, image_url, best_price, matches FROM search_results WHERE token = ?", (token,)
+    ).fetchone()
+    if not row:
+        return None
+    result = dict(row)
+    result['matches'] = json_loads(result['matches'])
+    return result
+
+def get_upload_count(email):
+    """Number of images the user has uploaded"""
+    row = get_db().execute("SELECT count FROM upload_counts WHERE email = ?", (email,)).fetchone()
+    return row['count'] if row else 0
+
+def _add_upload(conn, email, count):
+    """Add to the user's upload counter"""
+    conn.execute(
+        "INSERT INTO upload_counts (email, count) VALUES (?, ?) "
+        "ON CONFLICT (email) DO UPDATE SET count = count + excluded.count",
+        (email, count)
+    )
 
-def save_users(users):
-    """Save users to JSON file"""
-    with open(USERS_FILE, 'w') as f:
-        json.dump(users, f, indent=4)
+def add_upload(email, count=1):
+    """Atomically add to the user's upload counter"""
+    with get_db() as conn:
+        _add_upload(conn, email, count)
+
+def count_users():
+    """Return the number of registered users"""
+    cache = _users_cache()
+    if cache['count'] is None:
+        # user_stats is kept current by triggers, so this is a one-row read
+        cache['count'] = get_db().execute("SELECT total FROM user_stats WHERE id = 0").fetchone()[0]
+    return cache['count']
+
+def init_db():
+    """Create the users tables and import users.json from older installs once"""
+    conn = get_db()
+    conn.executescript(USERS_SCHEMA)
+    if count_users():
+        return
+    try:
+        with open(USERS_FILE, 'rb') as f:
+            legacy = json_loads(f.read())
+    except FileNotFoundError:
+        return
+    except ValueError as e:
+        print(f"⚠️ Could not migrate {USERS_FILE}: {e}")
+        return
+    for email, user in legacy.items():
+        if create_user(email, user):
+            with conn:
+                _insert_searches(conn, email, user.get('searches', []))
+            if user.get('uploads_count'):
+                add_upload(email, user['uploads_count'])
+    print(f"✅ Migrated {len(legacy)} users from {USERS_FILE} to {USERS_DB}")
+
+# scrypt work factor (~16 MB and a few tens of ms per hash)
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+
+# argon2id cost (64 MB, 3 passes, 2 lanes); hashes with other parameters are upgraded on login.
+# passlib's argon2 scheme also needs the argon2-cffi backend
+PWD_CONTEXT = CryptContext(
+    schemes=['argon2'],
+    argon2__type='ID',
+    argon2__memory_cost=65536,
+    argon2__rounds=3,
+    argon2__parallelism=2
+) if CryptContext and passlib_argon2.has_backend() else None
+if not PWD_CONTEXT:
+    print("⚠️ passlib/argon2-cffi not installed: hashing with scrypt, existing argon2 hashes can't be verified")
 
 def hash_password(password):
-    """Hash password with salt"""
-    salt = secrets.token_hex(16)
-    return salt + ':' + hashlib.sha256((salt + password).encode()).hexdigest()
+    """Hash password with argon2id when available, otherwise scrypt with a random salt"""
+    if PWD_CONTEXT:
+        return PWD_CONTEXT.hash(password)
+    salt = secrets.token_bytes(16)
+    hashed = hashlib.scrypt(password.encode(), salt=salt, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P, dklen=32)
+    return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${salt.hex()}${hashed.hex()}"
 
 def verify_password(stored_password, provided_password):
-    """Verify hashed password"""
+    """Verify hashed password (argon2id, scrypt, or the legacy salted SHA-256 format)"""
+    if stored_password.startswith('$argon2'):
+        return bool(PWD_CONTEXT) and PWD_CONTEXT.verify(provided_password, stored_password)
+    if stored_password.startswith('scrypt$'):
+        _, n, r, p, salt, hashed = stored_password.split('$')
+        computed = hashlib.scrypt(provided_password.encode(), salt=bytes.fromhex(salt),
+                                  n=int(n), r=int(r), p=int(p), dklen=len(hashed) // 2)
+        return secrets.compare_digest(computed.hex(), hashed)
     salt, hashed = stored_password.split(':')
-    return hashlib.sha256((salt + provided_password).encode()).hexdigest() == hashed
+    return secrets.compare_digest(hashlib.sha256((salt + provided_password).encode()).hexdigest(), hashed)
+
+def password_needs_rehash(stored_password):
+    """True for hashes older or weaker than what hash_password currently produces"""
+    if PWD_CONTEXT:
+        return not stored_password.startswith('$argon2') or PWD_CONTEXT.needs_update(stored_password)
+    if stored_password.startswith('$argon2'):
+        return False  # can't verify argon2 here, so never replace it
+    return not stored_password.startswith(f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}$")
+
+# Password hashing for requests runs on a pool sized to this process's share of
+# the CPUs. scrypt and argon2 release the GIL, so hashes run in parallel, but
+# across all workers at most one per core is in flight (each can take 16-64 MB);
+# extra logins queue instead of oversubscribing
+_HASH_POOL = ThreadPoolExecutor(max_workers=WORKER_CPUS, thread_name_prefix='hash')
+
+# Login token buckets (per IP and per email), checked before any lookup or hash:
+# LOGIN_BURST attempts at once, refilled at LOGIN_RATE attempts per second
+LOGIN_BURST = 5
+LOGIN_RATE = 5 / 60
+_MAX_BUCKETS = 10000
+_BUCKETS = {}  # key -> (tokens, last refill time)
+_BUCKETS_LOCK = threading.Lock()
+
+# Same bucket as a Redis hash, updated atomically so all workers share limits
+_TOKEN_BUCKET_LUA = '''
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local burst, rate, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local tokens = math.min(burst, (tonumber(state[1]) or burst) + (now - (tonumber(state[2]) or now)) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate))
+return allowed
+'''
+_token_bucket_script = app.config['SESSION_REDIS'].register_script(_TOKEN_BUCKET_LUA) if app.config.get('SESSION_REDIS') else None
+
+def take_token(key, burst=LOGIN_BURST, rate=LOGIN_RATE):
+    """Consume one token from key's bucket; False if the bucket is empty"""
+    now = time.time()
+    if _token_bucket_script:
+        return bool(_token_bucket_script(keys=[f'epc:bucket:{key}'], args=[burst, rate, now]))
+    with _BUCKETS_LOCK:
+        if len(_BUCKETS) > _MAX_BUCKETS:
+            # Forget buckets that have refilled completely
+            full = now - burst / rate
+            for k in [k for k, (_, ts) in _BUCKETS.items() if ts < full]:
+                del _BUCKETS[k]
+        tokens, ts = _BUCKETS.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - ts) * rate)
+        allowed = tokens >= 1
+        _BUCKETS[key] = (tokens - 1 if allowed else tokens, now)
+        return allowed
+
+# Verified against on unknown emails so both login failure paths cost one hash
+_DUMMY_PASSWORD_HASH = hash_password(secrets.token_hex(16))
 
 def init_users():
-    """Initialize users file with admin user"""
-    users = load_users()
-    if not users:
-        users['admin@epc.com'] = {
+    """Initialize users table with admin user"""
+    if not count_users():
+        create_user('admin@epc.com', {
             'username': 'admin',
             'password': hash_password('admin123'),
             'full_name': 'System Administrator',
             'role': 'admin',
-            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'last_login': None,
-            'uploads_count': 0
-        }
-        save_users(users)
+            'created_at': timestamp(),
+            'last_login': None
+        })
         print("✅ Admin user created: admin@epc.com / admin123")
 
 def log_activity(user_email, action, details=""):
     """Log user activities"""
     log_entry = {
-        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'timestamp': timestamp(),
         'user': user_email,
         'action': action,
         'details': details,
         'ip': request.remote_addr if request else 'N/A'
     }
     
-    # Print to console (command prompt)
-    print(f"📝 [{log_entry['timestamp']}] {user_email}: {action} {details}")
-    
-    # Save to file
+    # Non-blocking enqueue; the listener thread prints the console line and
+    # serializes the entry to the log file
+    _ACTIVITY_LOGGER.info("📝 [%s] %s: %s %s", log_entry['timestamp'], user_email, action, details,
+                          extra={'entry': log_entry})
+
+def _tail_lines(f, limit, block_size=64 << 10):
+    """Last `limit` lines of a binary file, read in blocks backwards from the end"""
+    chunks, newlines, pos = [], 0, f.seek(0, os.SEEK_END)
+    # One newline more than needed, so the partial first line can be dropped
+    while pos > 0 and newlines <= limit:
+        step = min(block_size, pos)
+        pos -= step
+        f.seek(pos)
+        chunk = f.read(step)
+        chunks.append(chunk)
+        newlines += chunk.count(b'\n')
+    return b''.join(reversed(chunks)).splitlines()[-limit:]
+
+def load_recent_logs(limit=MAX_LOGS):
+    """Return the most recent log entries from the current log file, oldest first"""
     logs = []
-    if os.path.exists(LOGS_FILE):
+    try:
+        with open(LOGS_FILE, 'rb') as f:
+            lines = _tail_lines(f, limit)
+    except FileNotFoundError:
+        return logs
+    for line in lines:
         try:
-            with open(LOGS_FILE, 'r') as f:
-                logs = json.load(f)
-        except:
-            pass
-    
-    logs.append(log_entry)
-    
-    # Keep only last 1000 logs
-    if len(logs) > 1000:
-        logs = logs[-1000:]
-    
-    with open(LOGS_FILE, 'w') as f:
-        json.dump(logs, f, indent=2)
+            logs.append(json_loads(line))
+        except ValueError:
+            continue
+    return logs
+
+def init_logs():
+    """Convert the legacy logs.json array into the append-only log file"""
+    try:
+        with open(LEGACY_LOGS_FILE, 'rb') as f:
+            legacy = json_loads(f.read())[-MAX_LOGS:]
+        # 'xb' fails if the new log already exists, so migration only happens once
+        with open(LOGS_FILE, 'xb', buffering=IO_BUFFER_SIZE) as f:
+            f.writelines(json_dumps(entry) + b'\n' for entry in legacy)
+    except (FileNotFoundError, FileExistsError):
+        pass
+    except Exception as e:
+        print(f"⚠️ Could not migrate {LEGACY_LOGS_FILE}: {e}")
+
+init_db()
+init_logs()
+
+class _JsonEntryFormatter(logging.Formatter):
+    """Formats an activity record as its JSON log entry"""
+    def format(self, record):
+        return json_dumps(record.entry).decode('utf-8')
+
+# Activity log: QueueHandler -> QueueListener -> console + NDJSON file
+_LOG_QUEUE = queue.SimpleQueue()
+_ACTIVITY_LOGGER = logging.getLogger('epc.activity')
+_ACTIVITY_LOGGER.setLevel(logging.INFO)
+_ACTIVITY_LOGGER.propagate = False
+_ACTIVITY_LOGGER.addHandler(QueueHandler(_LOG_QUEUE))
+# Every gunicorn worker appends to the same logs.jsonl, so no worker rotates it
+# itself: rotate it with logrotate (see the snippet in gunicorn_config.py) and
+# each worker reopens the file once it has been moved away
+_log_file_handler = WatchedFileHandler(LOGS_FILE, encoding='utf-8')
+_log_file_handler.setFormatter(_JsonEntryFormatter())
+_log_console_handler = logging.StreamHandler(sys.stdout)
+_log_console_handler.setFormatter(logging.Formatter('%(message)s'))
+
+class _LastLoginHandler(logging.Handler):
+    """Replays LOGIN entries into users.last_login, so login itself does a single enqueue"""
+    def emit(self, record):
+        entry = getattr(record, 'entry', None)
+        if entry and entry['action'] == 'LOGIN':
+            try:
+                update_user(entry['user'], last_login=entry['timestamp'])
+            except sqlite3.Error:
+                self.handleError(record)
+
+# Tail of this process's activity for the console monitor, so it never re-reads the log file
+RECENT_ACTIVITY = deque(maxlen=10)
+
+class _RecentActivityHandler(logging.Handler):
+    """Keeps the last few log entries in RECENT_ACTIVITY"""
+    def emit(self, record):
+        entry = getattr(record, 'entry', None)
+        if entry:
+            RECENT_ACTIVITY.append(entry)
+
+_LOG_LISTENER = QueueListener(_LOG_QUEUE, _log_console_handler, _log_file_handler,
+                              _LastLoginHandler(), _RecentActivityHandler())
+atexit.register(_LOG_LISTENER.stop)
 
 # ==========================================
 # 3. DECORATORS FOR AUTHENTICATION
 # ==========================================
 
+def current_user():
+    """Account fields of the logged-in user, looked up once per request (None if anonymous)"""
+    if 'user' not in g:
+        email = session.get('user_email')
+        g.user = get_user(email) if email else None
+    return g.user
+
 def login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -130,10 +621,9 @@ def admin_required(f):
             flash('⚠️ Please login to access this page', 'warning')
             return redirect(url_for('login'))
         
-        users = load_users()
-        user_email = session['user_email']
+        user = current_user()
         
-        if user_email not in users or users[user_email].get('role') != 'admin':
+        if not user or user.get('role') != 'admin':
             flash('🔒 Admin access required', 'danger')
             return redirect(url_for('index'))
             
@@ -144,60 +634,161 @@ def admin_required(f):
 # 4. DATABASE & AI LOADING
 # ==========================================
 
-def load_product_database():
-    """Load products from CSV files"""
-    products_list = []
-    
-    if not os.path.exists(DATASETS_FOLDER):
-        os.makedirs(DATASETS_FOLDER)
+PRODUCT_COLUMNS = ['id', 'name', 'category', 'store', 'price', 'currency', 'url', 'rating', 'brand',
+                   'model_id', 'stock', 'discount_percent', 'description', 'image_url']
+
+def _read_store_csv(filename):
+    """Read one store's CSV into a normalized product frame (None if unusable)"""
+    store_name = os.path.splitext(filename)[0].title()
+    file_path = os.path.join(DATASETS_FOLDER, filename)
     
+    try:
+        if pacsv:
+            df = pacsv.read_csv(
+                file_path,
+                read_options=pacsv.ReadOptions(use_threads=True),
+                parse_options=pacsv.ParseOptions(invalid_row_handler=lambda row: 'skip')
+            ).to_pandas()
+        else:
+            df = pd.read_csv(
+                file_path,
+                engine="c",
+                memory_map=True,
+                on_bad_lines="skip"
+            )
+        df.columns = df.columns.str.lower().str.strip()
+        
+        if 'name' not in df.columns or 'price' not in df.columns:
+            return None
+        
+        # Columnar extraction: coerce each column once instead of per row
+        df['price'] = pd.to_numeric(df['price'], errors='coerce')
+        df = df[df['name'].notna() & df['price'].notna()]
+        
+        def column(key, default):
+            return df[key] if key in df.columns else pd.Series(default, index=df.index, dtype=object)
+        
+        return pd.DataFrame({
+            'name': df['name'].astype(str).str.strip(),
+            'category': column('category', 'unknown').astype(str).str.lower(),
+            'store': store_name,
+            'price': df['price'].astype(float),
+            'currency': '₹',
+            'url': column('url', '#').astype(str),
+            'rating': column('rating', '4.0'),
+            'brand': column('brand', 'Generic').astype(str).str.title(),
+            'model_id': column('model_id', 'N/A').astype(str),
+            'stock': column('stock', 'In Stock').astype(str),
+            'discount_percent': column('discount_percent', 0),
+            'description': column('description', 'No description available.').astype(str),
+            'image_url': column('image_url', '').astype(str)
+        })
+    except Exception as e:
+        print(f"❌ Error reading {filename}: {e}")
+        return None
+
+# Parsed store frames by filename, reused while the file's mtime and size are unchanged
+_STORE_FRAMES = {}
+
+def _load_store_csv(filename):
+    """Product frame for one store CSV, parsed again only when the file has changed"""
+    try:
+        st = os.stat(os.path.join(DATASETS_FOLDER, filename))
+    except FileNotFoundError:
+        return None
+    version = (st.st_mtime_ns, st.st_size)
+    cached = _STORE_FRAMES.get(filename)
+    if cached and cached[0] == version:
+        return cached[1]
+    frame = _read_store_csv(filename)
+    _STORE_FRAMES[filename] = (version, frame)
+    return frame
+
+def load_product_database():
+    """Load products from CSV files into a single columnar DataFrame"""
+    os.makedirs(DATASETS_FOLDER, exist_ok=True)
     csv_files = [f for f in os.listdir(DATASETS_FOLDER) if f.endswith('.csv')]
+    frames = []
+    
+    for filename in set(_STORE_FRAMES).difference(csv_files):
+        _STORE_FRAMES.pop(filename, None)
     
     if not csv_files:
         print("⚠️ No CSV files found in datasets folder")
-        return []
-
-    for filename in csv_files:
-        store_name = os.path.splitext(filename)[0].title()
-        file_path = os.path.join(DATASETS_FOLDER, filename)
-        
-        try:
-             df = pd.read_csv(
-    file_path,
-    engine="python",
-    on_bad_lines="skip")
-)
-            df.columns = df.columns.str.lower().str.strip()
-            
-            for _, row in df.iterrows():
-                if 'name' not in row or 'price' not in row:
-                    continue
-                
-                products_list.append({
-                    "id": len(products_list) + 1,
-                    "name": str(row['name']).strip(),
-                    "category": str(row.get('category', 'unknown')).lower(),
-                    "store": store_name,
-                    "price": float(row['price']),
-                    "currency": "₹",
-                    "url": str(row.get('url', '#')),
-                    "rating": row.get('rating', '4.0'),
-                    "brand": str(row.get('brand', 'Generic')).title(),
-                    "model_id": str(row.get('model_id', 'N/A')),
-                    "stock": str(row.get('stock', 'In Stock')),
-                    "discount_percent": row.get('discount_percent', 0),
-                    "description": str(row.get('description', 'No description available.')),
-                    "image_url": str(row.get('image_url', ''))
-                })
-        except Exception as e:
-            print(f"❌ Error reading {filename}: {e}")
-
-    print(f"✅ Loaded {len(products_list)} products from {len(csv_files)} stores")
-    return products_list
+    else:
+        # read_csv releases the GIL while parsing, so stores load in parallel
+        with ThreadPoolExecutor(max_workers=min(8, len(csv_files))) as executor:
+            frames = [f for f in executor.map(_load_store_csv, csv_files) if f is not None]
 
-# Global variables
-PRODUCT_DATABASE = load_product_database()
-CSV_FILES = [f for f in os.listdir(DATASETS_FOLDER) if f.endswith('.csv')] if os.path.exists(DATASETS_FOLDER) else []
+    if frames:
+        db = pd.concat(frames, ignore_index=True)
+        db.insert(0, 'id', np.arange(1, len(db) + 1))
+    else:
+        db = pd.DataFrame(columns=PRODUCT_COLUMNS)
+    # Low-cardinality text columns become integer-coded categoricals
+    db = db.astype({'category': 'category', 'store': 'category', 'brand': 'category', 'price': float})
+
+    print(f"✅ Loaded {len(db)} products from {len(csv_files)} stores")
+    return db
+
+def product_records(df):
+    """Convert product rows to plain dicts of native Python values for templates/URLs"""
+    df = df[PRODUCT_COLUMNS]
+    # Blank CSV cells load as NaN, which the stdlib JSON encoders write as bare (invalid) NaN
+    df = df.astype(object).where(df.notna(), None)
+    columns = [df[c].tolist() for c in PRODUCT_COLUMNS]
+    return [dict(zip(PRODUCT_COLUMNS, row)) for row in zip(*columns)]
+
+def build_label_category_map(db, labels):
+    """Boolean (label id x category code) table of which categories each ImageNet label matches.
+    The extra last column is all False so uncategorised rows (code -1) never match."""
+    categories = [str(c) for c in db['category'].cat.categories]
+    table = np.zeros((len(labels), len(categories) + 1), dtype=bool)
+    for label_id, label in enumerate(labels):
+        label_lc = label.lower()
+        for code, category in enumerate(categories):
+            table[label_id, code] = label_lc in category or category in label_lc
+    return table
+
+def build_search_index(db):
+    """Lowercased "name brand category" of every row joined into one string, plus the
+    offset each row starts at, so keyword lookups are C-level str.find scans"""
+    texts = (db['name'].astype(str) + ' ' + db['brand'].astype(str) + ' ' +
+             db['category'].astype(str)).str.lower().tolist()
+    starts = list(accumulate((len(text) + 1 for text in texts), initial=0))
+    return '\n'.join(texts), starts
+
+def keyword_mask(search_index, words):
+    """Boolean row mask of products whose search text contains any of the words"""
+    blob, starts = search_index
+    mask = np.zeros(len(starts) - 1, dtype=bool)
+    # Repeated words can't add matches, so scan each distinct word once
+    for word in set(words):
+        pos = blob.find(word)
+        while pos != -1:
+            row = bisect_right(starts, pos) - 1
+            mask[row] = True
+            # One hit per row is enough: resume the scan at the next row
+            pos = blob.find(word, starts[row + 1])
+    return mask
+
+def build_price_order(db):
+    """Row positions sorted by price once per load (stable, so ties keep file order)"""
+    return np.argsort(db['price'].to_numpy(dtype=np.float64), kind='mergesort')
+
+def _rank_by_price(mask, price_order):
+    """Row positions selected by mask, in ascending price order (no per-query sort)"""
+    return price_order[mask[price_order]]
+
+# Keep TensorFlow's op thread pool to this worker's share of the CPUs
+tf.config.threading.set_intra_op_parallelism_threads(WORKER_CPUS)
+
+# Set EPC_XLA=1 to let XLA fuse the traced inference graph
+if os.environ.get('EPC_XLA') == '1':
+    tf.config.optimizer.set_jit(True)
+
+# Inference backend: 'keras' (default), 'tflite' (INT8, CPU) or 'tensorrt' (FP16, GPU)
+INFER_BACKEND = os.environ.get('EPC_INFER_BACKEND', 'keras').lower()
 
 print("🤖 Loading AI Model...")
 try:
@@ -207,15 +798,225 @@ except Exception as e:
     print(f"❌ Error loading model: {e}")
     model = None
 
+def load_imagenet_labels():
+    """ImageNet class names indexed by class id, decoded once instead of per prediction"""
+    decoded = decode_predictions(np.eye(1000, dtype=np.float32), top=1)
+    return [d[0][1].replace('_', ' ').title() for d in decoded]
+
+try:
+    IMAGENET_LABELS = load_imagenet_labels() if model else []
+except Exception as e:
+    print(f"❌ Error loading ImageNet labels: {e}")
+    model = None
+    IMAGENET_LABELS = []
+
+# Product rows plus every structure derived from them. Built as one immutable
+# value and published with a single assignment, so a request that reads CATALOG
+# once never mixes rows from one load with indexes from another
+Catalog = namedtuple('Catalog', 'db price_order search_index category_codes label_category_map csv_files')
+
+def build_catalog():
+    """Load the product CSVs and build the per-load search structures from them"""
+    db = load_product_database()
+    return Catalog(
+        db=db,
+        price_order=build_price_order(db),
+        search_index=build_search_index(db),
+        category_codes=db['category'].cat.codes.to_numpy(),
+        label_category_map=build_label_category_map(db, IMAGENET_LABELS),
+        csv_files=[f for f in os.listdir(DATASETS_FOLDER) if f.endswith('.csv')]
+    )
+
+# Global variables
+CATALOG = build_catalog()
+
 def prepare_image(image, target_size=(224, 224)):
-    """Prepare image for model prediction"""
+    """Resize image to the model input size as a (224, 224, 3) uint8 array"""
+    # For JPEGs, let libjpeg decode straight to RGB at a reduced scale (no-op otherwise)
+    image.draft("RGB", target_size)
     if image.mode != "RGB":
         image = image.convert("RGB")
-    image = image.resize(target_size)
-    image = img_to_array(image)
-    image = np.expand_dims(image, axis=0)
-    image = preprocess_input(image)
-    return image
+    # reducing_gap: shrink by an integer factor first (C box filter), so large PNG/WebP
+    # uploads, which draft() can't downscale, don't run bilinear over every source pixel
+    image = image.resize(target_size, Image.Resampling.BILINEAR, reducing_gap=3.0)
+    return np.asarray(image, dtype=np.uint8)
+
+# Dynamic batching: concurrent uploads are grouped into a single forward pass
+INFERENCE_MAX_BATCH = 16
+INFERENCE_MAX_WAIT_MS = 10
+INFERENCE_TIMEOUT = 30
+_INFERENCE_QUEUE = queue.Queue()
+_PENDING = {}  # request id -> Future, owned by the batching pipeline
+_REQUEST_IDS = iter(range(1, 2 ** 62))
+
+TFLITE_MODEL_FILE = 'mobilenet_v2_int8.tflite'
+TFLITE_MIN_CALIBRATION_IMAGES = 10
+
+def _calibration_images(limit=100):
+    """Previous uploads prepared as model inputs, for INT8 calibration"""
+    images = []
+    try:
+        filenames = os.listdir(UPLOAD_FOLDER)
+    except FileNotFoundError:
+        filenames = []
+    for filename in filenames:
+        if len(images) >= limit:
+            break
+        try:
+            images.append(prepare_image(Image.open(os.path.join(UPLOAD_FOLDER, filename))))
+        except Exception:
+            continue
+    return images
+
+def _build_keras_infer():
+    """Trace the Keras model once with a fixed signature so every batch reuses the same graph"""
+    traced = tf.function(
+        lambda x: model(x, training=False),
+        input_signature=[tf.TensorSpec([None, 224, 224, 3], tf.float32)]
+    ).get_concrete_function()
+    return lambda batch: traced(tf.constant(batch)).numpy()
+
+def _build_tflite_infer():
+    """Post-training INT8 quantized TFLite interpreter for CPU deployments, converted
+    once and reused from MODELS_FOLDER by later starts and other workers (delete the
+    file to recalibrate)"""
+    tflite_path = os.path.join(MODELS_FOLDER, TFLITE_MODEL_FILE)
+    if not os.path.exists(tflite_path):
+        images = _calibration_images()
+        # Quantization ranges come from these samples, so don't guess them from noise
+        if len(images) < TFLITE_MIN_CALIBRATION_IMAGES:
+            raise RuntimeError(f"INT8 calibration needs {TFLITE_MIN_CALIBRATION_IMAGES} uploaded images, "
+                               f"found {len(images)}")
+        converter = tf.lite.TFLiteConverter.from_keras_model(model)
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = lambda: (
+            [(image[np.newaxis].astype(np.float32) / 127.5) - 1.0] for image in images
+        )
+        os.makedirs(MODELS_FOLDER, exist_ok=True)
+        # Write then rename, so a worker starting meanwhile never loads a partial model
+        tmp_path = f'{tflite_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(converter.convert())
+        os.replace(tmp_path, tflite_path)
+    interpreter = tf.lite.Interpreter(model_path=tflite_path, num_threads=WORKER_CPUS)
+    input_index = interpreter.get_input_details()[0]['index']
+    output_index = interpreter.get_output_details()[0]['index']
+    interpreter.allocate_tensors()
+
+    def run(batch):
+        if interpreter.get_input_details()[0]['shape'][0] != len(batch):
+            interpreter.resize_tensor_input(input_index, batch.shape)
+            interpreter.allocate_tensors()
+        interpreter.set_tensor(input_index, batch)
+        interpreter.invoke()
+        return interpreter.get_tensor(output_index).copy()
+    return run
+
+def _build_tensorrt_infer():
+    """FP16 TensorRT engine for GPU deployments"""
+    saved_dir = os.path.join(MODELS_FOLDER, 'mobilenet_v2')
+    trt_dir = os.path.join(MODELS_FOLDER, 'mobilenet_v2_trt_fp16')
+    if not os.path.exists(trt_dir):
+        tf.saved_model.save(model, saved_dir)
+        converter = tf.experimental.tensorrt.Converter(
+            input_saved_model_dir=saved_dir,
+            conversion_params=tf.experimental.tensorrt.ConversionParams(precision_mode='FP16')
+        )
+        converter.convert()
+        converter.save(trt_dir)
+    signature = tf.saved_model.load(trt_dir).signatures['serving_default']
+    return lambda batch: next(iter(signature(tf.constant(batch)).values())).numpy()
+
+def build_inference_function():
+    """Build the batch -> predictions callable for the configured backend"""
+    builders = {
+        'keras': _build_keras_infer,
+        'tflite': _build_tflite_infer,
+        'tensorrt': _build_tensorrt_infer,
+    }
+    if INFER_BACKEND in builders and INFER_BACKEND != 'keras':
+        try:
+            run = builders[INFER_BACKEND]()
+            print(f"✅ Inference backend: {INFER_BACKEND}")
+            return run
+        except Exception as e:
+            print(f"⚠️ {INFER_BACKEND} backend unavailable ({e}), falling back to keras")
+    return _build_keras_infer()
+
+infer = build_inference_function() if model else None
+if infer:
+    # Run one batch now so the first upload doesn't pay graph optimization (or XLA compile) cost
+    infer(np.zeros((1, 224, 224, 3), dtype=np.float32))
+
+def _collect_batches():
+    """Yield micro-batches of queued uploads as (uint8 images, request ids)"""
+    while True:
+        items = [_INFERENCE_QUEUE.get()]
+        deadline = time.monotonic() + INFERENCE_MAX_WAIT_MS / 1000
+        while len(items) < INFERENCE_MAX_BATCH:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                items.append(_INFERENCE_QUEUE.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        ids = []
+        for _, future in items:
+            request_id = next(_REQUEST_IDS)
+            _PENDING[request_id] = future
+            ids.append(request_id)
+        yield np.stack([image_array for image_array, _ in items]), np.array(ids, dtype=np.int64)
+
+def _build_batch_pipeline():
+    """tf.data pipeline: MobileNetV2 scaling to [-1, 1] runs on TF threads and the next
+    batch is prepared (prefetched) while the current one is on the model"""
+    return tf.data.Dataset.from_generator(
+        _collect_batches,
+        output_signature=(
+            tf.TensorSpec([None, 224, 224, 3], tf.uint8),
+            tf.TensorSpec([None], tf.int64)
+        )
+    ).map(
+        lambda images, ids: ((tf.cast(images, tf.float32) / 127.5) - 1.0, ids),
+        num_parallel_calls=tf.data.AUTOTUNE
+    ).prefetch(tf.data.AUTOTUNE)
+
+def _inference_worker():
+    """Run prepared micro-batches through the model and resolve each request's future"""
+    for batch, ids in _build_batch_pipeline():
+        futures = [_PENDING.pop(request_id) for request_id in ids.numpy().tolist()]
+        try:
+            preds = infer(batch.numpy())
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            continue
+
+        # Top-3 class ids per row, highest score first
+        top = np.argpartition(-preds, 3, axis=1)[:, :3]
+        scores = np.take_along_axis(preds, top, axis=1)
+        order = np.argsort(-scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1).tolist()
+        scores = np.take_along_axis(scores, order, axis=1).tolist()
+        for future, class_ids, probs in zip(futures, top, scores):
+            future.set_result([(class_id, IMAGENET_LABELS[class_id], prob)
+                               for class_id, prob in zip(class_ids, probs)])
+
+def predict_image(processed_image):
+    """Queue a prepared image for batched inference and wait for its top-3 (class id, label, score)"""
+    future = Future()
+    _INFERENCE_QUEUE.put((processed_image, future))
+    return future.result(timeout=INFERENCE_TIMEOUT)
+
+def start_background_workers():
+    """Start the activity log listener and inference threads for this process"""
+    _LOG_LISTENER.start()
+    if model:
+        threading.Thread(target=_inference_worker, daemon=True).start()
+
+start_background_workers()
 
 # ==========================================
 # 5. HTML TEMPLATES
@@ -230,10 +1031,10 @@ BASE_TEMPLATE = '''
     <title>EPC | Smart Price Comparison</title>
     
     <!-- Bootstrap 5 CSS -->
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/css/bootstrap.min.css" rel="stylesheet">
+    <link href="{{ url_for('static', filename='vendor/bootstrap-5.3.2/css/bootstrap.min.css') }}" rel="stylesheet">
     
     <!-- Bootstrap Icons -->
-    <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/bootstrap-icons@1.11.1/font/bootstrap-icons.css">
+    <link rel="stylesheet" href="{{ url_for('static', filename='vendor/bootstrap-icons-1.13.1/bootstrap-icons.min.css') }}">
     
     <!-- Font Awesome -->
     <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.2/css/all.min.css">
@@ -244,433 +1045,8 @@ BASE_TEMPLATE = '''
     <!-- AOS Animation -->
     <link href="https://unpkg.com/aos@2.3.1/dist/aos.css" rel="stylesheet">
     
-    <style>
-        :root {
-            --primary-color: #6366f1;
-            --primary-dark: #4f46e5;
-            --secondary-color: #10b981;
-            --accent-color: #f59e0b;
-            --danger-color: #ef4444;
-            --dark-color: #1e293b;
-            --light-color: #f8fafc;
-            --gray-color: #64748b;
-            --card-shadow: 0 10px 25px -5px rgba(0, 0, 0, 0.1), 0 8px 10px -6px rgba(0, 0, 0, 0.1);
-            --hover-shadow: 0 20px 40px -10px rgba(0, 0, 0, 0.15);
-        }
-        
-        [data-bs-theme="dark"] {
-            --primary-color: #818cf8;
-            --primary-dark: #6366f1;
-            --dark-color: #0f172a;
-            --light-color: #1e293b;
-            --card-shadow: 0 10px 25px -5px rgba(0, 0, 0, 0.3);
-        }
-        
-        body {
-            font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            color: var(--dark-color);
-            overflow-x: hidden;
-        }
-        
-        .theme-toggle {
-            position: fixed;
-            top: 20px;
-            right: 20px;
-            z-index: 1000;
-            background: rgba(255, 255, 255, 0.9);
-            border-radius: 50px;
-            padding: 10px 20px;
-            backdrop-filter: blur(10px);
-            box-shadow: 0 4px 15px rgba(0, 0, 0, 0.1);
-            display: flex;
-            align-items: center;
-            gap: 10px;
-            cursor: pointer;
-            transition: all 0.3s ease;
-        }
-        
-        .theme-toggle:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 6px 20px rgba(0, 0, 0, 0.15);
-        }
-        
-        .glass-effect {
-            background: rgba(255, 255, 255, 0.9);
-            backdrop-filter: blur(10px);
-            border: 1px solid rgba(255, 255, 255, 0.2);
-            box-shadow: var(--card-shadow);
-        }
-        
-        [data-bs-theme="dark"] .glass-effect {
-            background: rgba(30, 41, 59, 0.9);
-            border: 1px solid rgba(255, 255, 255, 0.1);
-        }
-        
-        .hero-title {
-            font-size: 3.5rem;
-            font-weight: 800;
-            background: linear-gradient(135deg, var(--primary-color), var(--secondary-color));
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            margin-bottom: 1.5rem;
-        }
-        
-        @media (max-width: 768px) {
-            .hero-title {
-                font-size: 2.5rem;
-            }
-        }
-        
-        .feature-card {
-            background: white;
-            border-radius: 20px;
-            padding: 2rem;
-            height: 100%;
-            transition: all 0.3s ease;
-            border: 2px solid transparent;
-            position: relative;
-            overflow: hidden;
-        }
-        
-        [data-bs-theme="dark"] .feature-card {
-            background: var(--light-color);
-            color: white;
-        }
-        
-        .feature-card:hover {
-            transform: translateY(-10px);
-            box-shadow: var(--hover-shadow);
-            border-color: var(--primary-color);
-        }
-        
-        .feature-card::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            height: 4px;
-            background: linear-gradient(90deg, var(--primary-color), var(--secondary-color));
-        }
-        
-        .feature-icon {
-            width: 70px;
-            height: 70px;
-            background: linear-gradient(135deg, var(--primary-color), var(--primary-dark));
-            border-radius: 16px;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            margin-bottom: 1.5rem;
-            color: white;
-            font-size: 1.8rem;
-        }
-        
-        .upload-container {
-            background: rgba(255, 255, 255, 0.95);
-            border-radius: 24px;
-            padding: 3rem;
-            margin: 3rem auto;
-            max-width: 800px;
-        }
-        
-        [data-bs-theme="dark"] .upload-container {
-            background: rgba(30, 41, 59, 0.95);
-        }
-        
-        .upload-area {
-            border: 3px dashed var(--primary-color);
-            border-radius: 16px;
-            padding: 3rem 2rem;
-            text-align: center;
-            cursor: pointer;
-            transition: all 0.3s ease;
-            background: rgba(99, 102, 241, 0.05);
-            position: relative;
-            overflow: hidden;
-        }
-        
-        .upload-area:hover {
-            border-color: var(--primary-dark);
-            background: rgba(99, 102, 241, 0.1);
-            transform: scale(1.01);
-        }
-        
-        .upload-area.active {
-            border-color: var(--secondary-color);
-            background: rgba(16, 185, 129, 0.1);
-        }
-        
-        .upload-icon {
-            font-size: 4rem;
-            color: var(--primary-color);
-            margin-bottom: 1rem;
-            transition: all 0.3s ease;
-        }
-        
-        .upload-area:hover .upload-icon {
-            transform: scale(1.1) rotate(5deg);
-        }
-        
-        .product-card {
-            background: white;
-            border-radius: 16px;
-            overflow: hidden;
-            transition: all 0.3s ease;
-            height: 100%;
-            border: 1px solid #e2e8f0;
-            position: relative;
-        }
-        
-        [data-bs-theme="dark"] .product-card {
-            background: var(--light-color);
-            border-color: #334155;
-        }
-        
-        .product-card:hover {
-            transform: translateY(-8px);
-            box-shadow: var(--hover-shadow);
-            border-color: var(--primary-color);
-        }
-        
-        .product-badge {
-            position: absolute;
-            top: 15px;
-            left: 15px;
-            background: linear-gradient(135deg, var(--primary-color), var(--primary-dark));
-            color: white;
-            padding: 0.5rem 1rem;
-            border-radius: 50px;
-            font-size: 0.8rem;
-            font-weight: 600;
-            box-shadow: 0 4px 12px rgba(99, 102, 241, 0.3);
-            z-index: 1;
-        }
-        
-        .best-price-badge {
-            position: absolute;
-            top: 15px;
-            right: 15px;
-            background: linear-gradient(135deg, var(--secondary-color), #059669);
-            color: white;
-            padding: 0.5rem 1rem;
-            border-radius: 50px;
-            font-size: 0.8rem;
-            font-weight: 600;
-            animation: pulse 2s infinite;
-            z-index: 1;
-        }
-        
-        @keyframes pulse {
-            0% { box-shadow: 0 0 0 0 rgba(16, 185, 129, 0.7); }
-            70% { box-shadow: 0 0 0 10px rgba(16, 185, 129, 0); }
-            100% { box-shadow: 0 0 0 0 rgba(16, 185, 129, 0); }
-        }
-        
-        .price-tag {
-            font-size: 2rem;
-            font-weight: 800;
-            color: var(--primary-color);
-            margin: 1rem 0;
-        }
-        
-        .discount-badge {
-            background: linear-gradient(135deg, var(--danger-color), #dc2626);
-            color: white;
-            padding: 0.25rem 0.75rem;
-            border-radius: 6px;
-            font-size: 0.875rem;
-            font-weight: 600;
-            margin-left: 0.5rem;
-        }
-        
-        .loading-overlay {
-            position: fixed;
-            top: 0;
-            left: 0;
-            width: 100%;
-            height: 100%;
-            background: rgba(255, 255, 255, 0.95);
-            display: flex;
-            flex-direction: column;
-            align-items: center;
-            justify-content: center;
-            z-index: 9999;
-            backdrop-filter: blur(5px);
-        }
-        
-        [data-bs-theme="dark"] .loading-overlay {
-            background: rgba(15, 23, 42, 0.95);
-        }
-        
-        .loader {
-            width: 60px;
-            height: 60px;
-            border: 4px solid rgba(99, 102, 241, 0.1);
-            border-top-color: var(--primary-color);
-            border-radius: 50%;
-            animation: spin 1s linear infinite;
-        }
-        
-        @keyframes spin {
-            to { transform: rotate(360deg); }
-        }
-        
-        .notification-container {
-            position: fixed;
-            top: 20px;
-            right: 20px;
-            z-index: 9999;
-            max-width: 400px;
-        }
-        
-        .notification {
-            background: white;
-            border-radius: 12px;
-            padding: 1rem 1.5rem;
-            margin-bottom: 1rem;
-            box-shadow: var(--card-shadow);
-            border-left: 5px solid var(--primary-color);
-            display: flex;
-            align-items: center;
-            gap: 12px;
-            animation: slideInRight 0.3s ease;
-            transform-origin: right;
-        }
-        
-        [data-bs-theme="dark"] .notification {
-            background: var(--light-color);
-            color: white;
-        }
-        
-        .notification.success {
-            border-left-color: var(--secondary-color);
-        }
-        
-        .notification.warning {
-            border-left-color: var(--accent-color);
-        }
-        
-        .notification.danger {
-            border-left-color: var(--danger-color);
-        }
-        
-        .notification-icon {
-            font-size: 1.5rem;
-        }
-        
-        @keyframes slideInRight {
-            from { transform: translateX(100%) scale(0.8); opacity: 0; }
-            to { transform: translateX(0) scale(1); opacity: 1; }
-        }
-        
-        @keyframes slideOutRight {
-            from { transform: translateX(0) scale(1); opacity: 1; }
-            to { transform: translateX(100%) scale(0.8); opacity: 0; }
-        }
-        
-        .stats-card {
-            background: linear-gradient(135deg, var(--primary-color), var(--primary-dark));
-            color: white;
-            border-radius: 16px;
-            padding: 2rem;
-            text-align: center;
-            transition: all 0.3s ease;
-            position: relative;
-            overflow: hidden;
-        }
-        
-        .stats-card::before {
-            content: '';
-            position: absolute;
-            top: -50%;
-            left: -50%;
-            width: 200%;
-            height: 200%;
-            background: radial-gradient(circle, rgba(255,255,255,0.1) 0%, transparent 70%);
-        }
-        
-        .stats-number {
-            font-size: 3rem;
-            font-weight: 800;
-            margin-bottom: 0.5rem;
-            display: block;
-        }
-        
-        .btn-gradient {
-            background: linear-gradient(135deg, var(--primary-color), var(--primary-dark));
-            color: white;
-            border: none;
-            border-radius: 50px;
-            padding: 0.875rem 2rem;
-            font-weight: 600;
-            transition: all 0.3s ease;
-            position: relative;
-            overflow: hidden;
-        }
-        
-        .btn-gradient::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: -100%;
-            width: 100%;
-            height: 100%;
-            background: linear-gradient(90deg, transparent, rgba(255,255,255,0.2), transparent);
-            transition: left 0.5s ease;
-        }
-        
-        .btn-gradient:hover::before {
-            left: 100%;
-        }
-        
-        .btn-gradient:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 10px 25px rgba(99, 102, 241, 0.3);
-        }
-        
-        .fab {
-            position: fixed;
-            bottom: 30px;
-            right: 30px;
-            width: 60px;
-            height: 60px;
-            border-radius: 50%;
-            background: linear-gradient(135deg, var(--primary-color), var(--primary-dark));
-            color: white;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            font-size: 1.5rem;
-            box-shadow: 0 6px 20px rgba(99, 102, 241, 0.4);
-            cursor: pointer;
-            z-index: 100;
-            transition: all 0.3s ease;
-        }
-        
-        .fab:hover {
-            transform: scale(1.1) rotate(90deg);
-            box-shadow: 0 10px 30px rgba(99, 102, 241, 0.6);
-        }
-        
-        @media (max-width: 768px) {
-            .container {
-                padding-left: 15px;
-                padding-right: 15px;
-            }
-            
-            .upload-container {
-                padding: 2rem 1rem;
-                margin: 1rem auto;
-            }
-            
-            .stats-number {
-                font-size: 2rem;
-            }
-        }
-    </style>
+    <!-- Site styles (served by the static handler and cached by the browser) -->
+    <link rel="stylesheet" href="{{ url_for('static', filename='css/base.css') }}">
 </head>
 <body>
     <!-- Theme Toggle -->
@@ -716,7 +1092,8 @@ BASE_TEMPLATE = '''
     {% block main_content %}{% endblock %}
     
     <!-- Bootstrap JS -->
-    <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/js/bootstrap.bundle.min.js"></script>
+    <script src="{{ url_for('static', filename='vendor/popper-2.11.8/popper.min.js') }}"></script>
+    <script src="{{ url_for('static', filename='vendor/bootstrap-5.3.2/js/bootstrap.min.js') }}"></script>
     
     <!-- AOS Animation -->
     <script src="https://unpkg.com/aos@2.3.1/dist/aos.js"></script>
@@ -822,64 +1199,7 @@ BASE_TEMPLATE = '''
 </html>
 '''
 
-# ==========================================
-# 6. ROUTES - AUTHENTICATION
-# ==========================================
-
-@app.route('/register', methods=['GET', 'POST'])
-def register():
-    """User registration"""
-    if request.method == 'POST':
-        email = request.form.get('email', '').strip().lower()
-        username = request.form.get('username', '').strip()
-        full_name = request.form.get('full_name', '').strip()
-        password = request.form.get('password', '')
-        confirm_password = request.form.get('confirm_password', '')
-        
-        # Validation
-        if not all([email, username, full_name, password]):
-            flash('All fields are required', 'danger')
-            return redirect(url_for('register'))
-        
-        if password != confirm_password:
-            flash('Passwords do not match', 'danger')
-            return redirect(url_for('register'))
-        
-        if len(password) < 6:
-            flash('Password must be at least 6 characters', 'danger')
-            return redirect(url_for('register'))
-        
-        # Load users
-        users = load_users()
-        
-        # Check if user exists
-        if email in users:
-            flash('Email already registered', 'danger')
-            return redirect(url_for('register'))
-        
-        # Create new user
-        users[email] = {
-            'username': username,
-            'password': hash_password(password),
-            'full_name': full_name,
-            'role': 'user',
-            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'last_login': None,
-            'uploads_count': 0,
-            'searches': []
-        }
-        
-        # Save users
-        save_users(users)
-        
-        # Log activity
-        log_activity(email, 'REGISTER', f'New user: {username}')
-        
-        flash('Registration successful! Please login', 'success')
-        return redirect(url_for('login'))
-    
-    # GET request - show registration form
-    return render_template_string('''
+REGISTER_TEMPLATE = '''
 {% extends "base.html" %}
 {% block main_content %}
 <div class="auth-container animate__animated animate__fadeIn">
@@ -935,64 +1255,17 @@ def register():
     </div>
 </div>
 {% endblock %}
-''')
+'''
 
-@app.route('/login', methods=['GET', 'POST'])
-def login():
-    """User login"""
-    if request.method == 'POST':
-        email = request.form.get('email', '').strip().lower()
-        password = request.form.get('password', '')
-        
-        # Validation
-        if not email or not password:
-            flash('Email and password are required', 'danger')
-            return redirect(url_for('login'))
-        
-        # Load users
-        users = load_users()
-        
-        # Check if user exists
-        if email not in users:
-            flash('Invalid email or password', 'danger')
-            return redirect(url_for('login'))
-        
-        # Verify password
-        if not verify_password(users[email]['password'], password):
-            flash('Invalid email or password', 'danger')
-            return redirect(url_for('login'))
-        
-        # Update last login
-        users[email]['last_login'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        save_users(users)
-        
-        # Set session
-        session['user_email'] = email
-        session['user_name'] = users[email]['username']
-        session['full_name'] = users[email]['full_name']
-        session['role'] = users[email]['role']
-        session.permanent = True
-        
-        # Log activity
-        log_activity(email, 'LOGIN', f'Successful login from {request.remote_addr}')
-        
-        flash(f'Welcome back, {users[email]["username"]}!', 'success')
-        
-        # Redirect based on role
-        if users[email]['role'] == 'admin':
-            return redirect(url_for('admin_dashboard'))
-        return redirect(url_for('index'))
-    
-    # GET request - show login form
-    return render_template_string('''
+LOGIN_TEMPLATE = '''
 <!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Login - EPC System</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/css/bootstrap.min.css" rel="stylesheet">
-    <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/bootstrap-icons@1.11.1/font/bootstrap-icons.css">
+    <link href="{{ url_for('static', filename='vendor/bootstrap-5.3.2/css/bootstrap.min.css') }}" rel="stylesheet">
+    <link rel="stylesheet" href="{{ url_for('static', filename='vendor/bootstrap-icons-1.13.1/bootstrap-icons.min.css') }}">
     <style>
         body {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
@@ -1106,43 +1379,22 @@ def login():
         </div>
     </div>
     
-    <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/js/bootstrap.bundle.min.js"></script>
+    <script src="{{ url_for('static', filename='vendor/popper-2.11.8/popper.min.js') }}"></script>
+    <script src="{{ url_for('static', filename='vendor/bootstrap-5.3.2/js/bootstrap.min.js') }}"></script>
 </body>
 </html>
-''')
-
-@app.route('/logout')
-def logout():
-    """User logout"""
-    if 'user_email' in session:
-        log_activity(session['user_email'], 'LOGOUT', 'User logged out')
-        session.clear()
-    flash('You have been logged out', 'info')
-    return redirect(url_for('index'))
-
-# ==========================================
-# 7. MAIN HOME PAGE
-# ==========================================
+'''
 
-@app.route('/')
-def index():
-    """Main home page"""
-    users = load_users()
-    total_users = len(users)
-    active_users = sum(1 for u in users.values() if u.get('last_login'))
-    
-    # Get any passed parameters
-    prediction = request.args.get('prediction', '')
-    matches_str = request.args.get('matches', '[]')
-    uploaded_image_url = request.args.get('uploaded_image_url', '')
-    global_best_price = request.args.get('global_best_price', '')
-    
-    try:
-        matches = eval(matches_str)
-    except:
-        matches = []
-    
-    template = BASE_TEMPLATE.replace('{% block main_content %}{% endblock %}', '''
+INDEX_TEMPLATE = '''
+{% extends "base.html" %}
+{% macro upload_area(title, hint, extra_class='', clickable=false) %}
+<div class="upload-area{{ extra_class }}"{% if clickable %} onclick="document.getElementById('fileInput').click()"{% endif %} id="uploadArea">
+    <i class="bi bi-cloud-arrow-up upload-icon"></i>
+    <h5>{{ title }}</h5>
+    <p class="text-muted mb-0">{{ hint }}</p>
+    <small class="text-muted">Max file size: 16MB</small>
+</div>
+{% endmacro %}
 {% block main_content %}
 <!-- Navbar -->
 <nav class="navbar navbar-expand-lg navbar-dark fixed-top" style="background: rgba(30, 41, 59, 0.95); backdrop-filter: blur(10px);">
@@ -1180,23 +1432,23 @@ def index():
                         <i class="bi bi-info-circle me-1"></i> How It Works
                     </a>
                 </li>
-                ''' + ('''
+                {% if is_admin %}
                 <li class="nav-item">
                     <a class="nav-link" href="/admin/dashboard">
                         <i class="bi bi-speedometer2 me-1"></i> Admin
                     </a>
                 </li>
-                ''' if 'user_email' in session and session.get('role') == 'admin' else '') + '''
+                {% endif %}
             </ul>
             
             <div class="navbar-nav ms-auto">
-                ''' + ('''
+                {% if logged_in %}
                 <div class="dropdown">
                     <a href="#" class="nav-link dropdown-toggle d-flex align-items-center" data-bs-toggle="dropdown">
                         <div class="user-avatar me-2" style="width: 32px; height: 32px; background: linear-gradient(135deg, #6366f1, #10b981); border-radius: 50%; display: flex; align-items: center; justify-content: center; color: white; font-weight: 600;">
-                            ''' + (session.get('user_name', 'U')[0].upper() if session.get('user_name') else 'U') + '''
+                            {{ user_name[0]|upper if user_name else 'U' }}
                         </div>
-                        ''' + (session.get('user_name', 'User') if session.get('user_name') else 'User') + '''
+                        {{ user_name or 'User' }}
                     </a>
                     <ul class="dropdown-menu dropdown-menu-end">
                         <li>
@@ -1217,14 +1469,14 @@ def index():
                         </li>
                     </ul>
                 </div>
-                ''' if 'user_email' in session else '''
+                {% else %}
                 <a href="/login" class="btn btn-outline-light me-2">
                     <i class="bi bi-box-arrow-in-right me-1"></i> Login
                 </a>
                 <a href="/register" class="btn btn-gradient">
                     <i class="bi bi-person-plus me-1"></i> Register
                 </a>
-                ''') + '''
+                {% endif %}
             </div>
         </div>
     </div>
@@ -1256,19 +1508,19 @@ def index():
                     <div class="row">
                         <div class="col-4">
                             <div class="text-center">
-                                <h3 class="text-primary fw-bold">''' + str(len(PRODUCT_DATABASE)) + '''</h3>
+                                <h3 class="text-primary fw-bold">{{ product_count }}</h3>
                                 <p class="text-muted mb-0">Products</p>
                             </div>
                         </div>
                         <div class="col-4">
                             <div class="text-center">
-                                <h3 class="text-primary fw-bold">''' + str(len(CSV_FILES)) + '''</h3>
+                                <h3 class="text-primary fw-bold">{{ store_count }}</h3>
                                 <p class="text-muted mb-0">Stores</p>
                             </div>
                         </div>
                         <div class="col-4">
                             <div class="text-center">
-                                <h3 class="text-primary fw-bold">''' + str(total_users) + '''</h3>
+                                <h3 class="text-primary fw-bold">{{ total_users }}</h3>
                                 <p class="text-muted mb-0">Users</p>
                             </div>
                         </div>
@@ -1284,12 +1536,8 @@ def index():
                         <p class="text-muted">Upload any product image for instant recognition</p>
                     </div>
                     
-                    <div class="upload-area rounded-3 p-5 mb-4" id="uploadArea">
-                        <i class="bi bi-cloud-arrow-up upload-icon"></i>
-                        <h5>Drag & Drop Image</h5>
-                        <p class="text-muted mb-0">or click to browse (JPG, PNG, WebP)</p>
-                        <small class="text-muted">Max file size: 16MB</small>
-                    </div>
+                    {{ upload_area('Drag & Drop Image', 'or click to browse (JPG, PNG, WebP)',
+                                   extra_class=' rounded-3 p-5 mb-4') }}
                     
                     <div class="d-grid">
                         <button class="btn btn-gradient" onclick="document.getElementById('fileInput').click()">
@@ -1362,14 +1610,14 @@ def index():
                 <p class="text-muted">Upload an image or search by keywords to compare prices</p>
             </div>
             
-            ''' + ('''
+            {% if not logged_in %}
             <div class="alert alert-warning alert-dismissible fade show mb-4" role="alert">
                 <i class="bi bi-info-circle me-2"></i>
                 <a href="/login" class="alert-link">Login</a> or 
                 <a href="/register" class="alert-link">Register</a> to save your search history and preferences!
                 <button type="button" class="btn-close" data-bs-dismiss="alert"></button>
             </div>
-            ''' if 'user_email' not in session else '') + '''
+            {% endif %}
             
             <form action="/process" method="post" enctype="multipart/form-data" id="mainForm">
                 <!-- File Upload -->
@@ -1378,15 +1626,8 @@ def index():
                         <i class="bi bi-camera me-2"></i>Upload Product Image
                     </label>
                     
-                    <div class="upload-area" onclick="document.getElementById('fileInput').click()" 
-                         id="uploadArea">
-                        <i class="bi bi-cloud-arrow-up upload-icon"></i>
-                        <h5>Click to upload image</h5>
-                        <p class="text-muted mb-0">
-                            Drag & drop or click to browse (JPG, PNG, WebP)
-                        </p>
-                        <small class="text-muted">Max file size: 16MB</small>
-                    </div>
+                    {{ upload_area('Click to upload image', 'Drag & drop or click to browse (JPG, PNG, WebP)',
+                                   clickable=true) }}
                     
                     <input type="file" id="fileInput" name="file" class="d-none" 
                            accept="image/*" onchange="handleFileUpload(this)" required>
@@ -1493,7 +1734,7 @@ def index():
 </section>
 
 <!-- Results Section -->
-''' + ('''
+{% if prediction %}
 <section class="py-5">
     <div class="container">
         <div class="upload-container" data-aos="fade-up">
@@ -1503,29 +1744,29 @@ def index():
                         <i class="bi bi-robot text-primary me-2"></i>AI Detection Result
                     </h4>
                     <div class="badge bg-primary bg-gradient fs-6 p-2">
-                        ''' + prediction + '''
+                        {{ prediction }}
                     </div>
                 </div>
-                ''' + ('''
+                {% if matches %}
                 <div class="badge bg-success bg-gradient fs-6 p-2 mt-2 mt-md-0">
-                    ''' + str(len(matches)) + ''' products found
+                    {{ matches|length }} products found
                 </div>
-                ''' if matches else '') + '''
+                {% endif %}
             </div>
             
-            ''' + ('''
+            {% if not matches %}
             <div class="alert alert-info">
                 <i class="bi bi-exclamation-triangle me-2"></i>
                 No exact matches found. Try using different keywords or upload a clearer image.
             </div>
-            ''' if not matches else '') + '''
+            {% endif %}
         </div>
     </div>
 </section>
-''' if prediction else '') + '''
+{% endif %}
 
 <!-- Products Grid -->
-''' + ('''
+{% if matches %}
 <section class="py-5">
     <div class="container">
         <div class="d-flex justify-content-between align-items-center mb-4">
@@ -1544,71 +1785,56 @@ def index():
             </div>
         </div>
         
-        <div class="row g-4">
-''' + ''.join([f'''
+        <div class="row g-4" id="productGrid"></div>
+        
+        <!-- Product card, cloned and filled in per match by renderMatches() -->
+        <template id="productCardTemplate">
             <div class="col-xl-3 col-lg-4 col-md-6" data-aos="fade-up">
                 <div class="product-card">
                     <div class="position-relative">
-                        <img src="{uploaded_image_url if uploaded_image_url else 'https://via.placeholder.com/300x250/e2e8f0/64748b?text=Product'}" 
-                             class="product-image" alt="{match['name']}">
-                        <span class="product-badge">{match['store']}</span>
-                        ''' + (f'''
-                        <span class="best-price-badge">Best Price</span>
-                        ''' if global_best_price and match['price'] == float(global_best_price) else '') + '''
-                        ''' + (f'''
-                        <span class="badge bg-danger position-absolute" 
-                              style="bottom: 15px; left: 15px;">
-                            -{match['discount_percent']}% OFF
-                        </span>
-                        ''' if float(match.get('discount_percent', 0)) > 20 else '') + '''
+                        <img class="product-image" data-field="image">
+                        <span class="product-badge" data-field="store"></span>
+                        <span class="best-price-badge" data-field="bestPrice">Best Price</span>
+                        <span class="badge bg-danger position-absolute" data-field="bigDiscount"
+                              style="bottom: 15px; left: 15px;"></span>
                     </div>
                     
                     <div class="p-3">
-                        <h5 class="mb-2" style="height: 3rem; overflow: hidden;">
-                            {match['name']}
-                        </h5>
+                        <h5 class="mb-2" style="height: 3rem; overflow: hidden;" data-field="name"></h5>
                         
                         <div class="d-flex align-items-center mb-2">
-                            <span class="price-tag">
-                                {match['currency']}{"{:.2f}".format(match['price'])}
-                            </span>
-                            ''' + (f'''
-                            <span class="discount-badge">Save {match['discount_percent']}%</span>
-                            ''' if float(match.get('discount_percent', 0)) > 0 else '') + '''
+                            <span class="price-tag" data-field="price"></span>
+                            <span class="discount-badge" data-field="discount"></span>
                         </div>
                         
                         <div class="d-flex justify-content-between align-items-center mb-3">
                             <div class="d-flex align-items-center">
                                 <i class="bi bi-star-fill text-warning me-1"></i>
-                                <span>{match['rating']}</span>
+                                <span data-field="rating"></span>
                             </div>
                             <span class="badge bg-light text-dark">
-                                <i class="bi bi-tag me-1"></i>{match['brand']}
+                                <i class="bi bi-tag me-1"></i><span data-field="brand"></span>
                             </span>
                         </div>
                         
-                        <p class="small text-muted mb-3" style="height: 3rem; overflow: hidden;">
-                            {match['description'][:80]}{'...' if len(match['description']) > 80 else ''}
-                        </p>
+                        <p class="small text-muted mb-3" style="height: 3rem; overflow: hidden;" data-field="description"></p>
                         
                         <div class="d-grid gap-2">
-                            <a href="{match['url']}" target="_blank" 
-                               class="btn btn-outline-primary">
-                                <i class="bi bi-cart-plus me-2"></i>View on {match['store']}
+                            <a target="_blank" class="btn btn-outline-primary" data-field="link">
+                                <i class="bi bi-cart-plus me-2"></i>View on <span data-field="linkStore"></span>
                             </a>
-                            <button class="btn btn-light" 
-                                    onclick="addToWishlist('{match['id']}')">
+                            <button class="btn btn-light" data-field="wishlist">
                                 <i class="bi bi-heart me-2"></i>Save for Later
                             </button>
                         </div>
                     </div>
                 </div>
             </div>
-''' for match in matches]) + '''
-        </div>
+        </template>
+        <script id="matchesData" type="application/json">{{ {'matches': matches, 'image_url': uploaded_image_url}|tojson }}</script>
     </div>
 </section>
-''' if matches else '') + '''
+{% endif %}
 
 <!-- Footer -->
 <footer class="footer mt-5 py-5" style="background: rgba(30, 41, 59, 0.95); backdrop-filter: blur(10px); border-top: 1px solid rgba(255, 255, 255, 0.1);">
@@ -1643,14 +1869,14 @@ def index():
             <div class="col-lg-2 col-6 mb-4">
                 <h6 class="text-white mb-4">Account</h6>
                 <ul class="list-unstyled">
-                    ''' + ('''
+                    {% if logged_in %}
                     <li class="mb-2"><a href="/profile" class="text-muted text-decoration-none">Profile</a></li>
                     <li class="mb-2"><a href="/my-searches" class="text-muted text-decoration-none">History</a></li>
                     <li class="mb-2"><a href="/logout" class="text-muted text-decoration-none">Logout</a></li>
-                    ''' if 'user_email' in session else '''
+                    {% else %}
                     <li class="mb-2"><a href="/login" class="text-muted text-decoration-none">Login</a></li>
                     <li class="mb-2"><a href="/register" class="text-muted text-decoration-none">Register</a></li>
-                    ''') + '''
+                    {% endif %}
                 </ul>
             </div>
             
@@ -1679,7 +1905,6 @@ def index():
         </div>
     </div>
 </footer>
-{% endblock %}
 
 <script>
     // File upload with preview
@@ -1723,6 +1948,50 @@ def index():
         uploadArea.classList.remove('active');
     }
     
+    // Build the product cards from the JSON results payload
+    function renderMatches() {
+        const data = document.getElementById('matchesData');
+        if (!data) return;
+        const results = JSON.parse(data.textContent);
+        const template = document.getElementById('productCardTemplate');
+        const grid = document.getElementById('productGrid');
+        const placeholder = 'https://via.placeholder.com/300x250/e2e8f0/64748b?text=Product';
+        
+        for (const match of results.matches) {
+            const card = template.content.cloneNode(true);
+            const field = (name) => card.querySelector(`[data-field="${name}"]`);
+            
+            field('image').src = results.image_url || placeholder;
+            field('image').alt = match.name;
+            field('store').textContent = match.store;
+            if (!match._best) {
+                field('bestPrice').remove();
+            }
+            if (match._big) {
+                field('bigDiscount').textContent = `-${match.discount_percent}% OFF`;
+            } else {
+                field('bigDiscount').remove();
+            }
+            field('name').textContent = match.name;
+            field('price').textContent = match.currency + match._price.toFixed(2);
+            if (match._disc > 0) {
+                field('discount').textContent = `Save ${match.discount_percent}%`;
+            } else {
+                field('discount').remove();
+            }
+            field('rating').textContent = Number(match.rating).toFixed(1);
+            field('brand').textContent = match.brand;
+            const description = String(match.description);
+            field('description').textContent = description.slice(0, 80) + (description.length > 80 ? '...' : '');
+            field('link').href = match.url;
+            field('linkStore').textContent = match.store;
+            field('wishlist').addEventListener('click', () => addToWishlist(match.id));
+            
+            grid.appendChild(card);
+        }
+    }
+    renderMatches();
+    
     // Add to wishlist function
     function addToWishlist(productId) {
         showLoading();
@@ -1752,182 +2021,46 @@ def index():
             
             if (e.dataTransfer.files.length) {
                 fileInput.files = e.dataTransfer.files;
-                handleFileUpload(fileInput);
-            }
-        });
-    }
-    
-    // Simulate upload progress
-    function simulateUploadProgress() {
-        const progressBar = document.getElementById('progressBar');
-        const progressContainer = document.getElementById('uploadProgress');
-        let width = 0;
-        
-        progressContainer.style.display = 'block';
-        
-        const interval = setInterval(() => {
-            if (width >= 100) {
-                clearInterval(interval);
-                setTimeout(() => {
-                    progressContainer.style.display = 'none';
-                    progressBar.style.width = '0%';
-                }, 500);
-            } else {
-                width += 10;
-                progressBar.style.width = width + '%';
-            }
-        }, 200);
-    }
-    
-    // Auto-complete for keywords
-    const keywordsInput = document.getElementById('keywordsInput');
-    if (keywordsInput) {
-        keywordsInput.addEventListener('input', function(e) {
-            console.log('Searching for:', e.target.value);
-        });
-    }
-</script>
-''')
-    
-    return render_template_string(template)
-
-# ==========================================
-# 8. PROCESS IMAGE ROUTE
-# ==========================================
-
-@app.route('/process', methods=['POST'])
-@login_required
-def process():
-    """Process image and find matches"""
-    if 'file' not in request.files:
-        flash('No file selected', 'danger')
-        return redirect(url_for('index'))
-    
-    file = request.files['file']
-    keywords = request.form.get('keywords', '').lower().strip()
-    
-    if file.filename == '':
-        flash('No file selected', 'danger')
-        return redirect(url_for('index'))
-    
-    try:
-        # Save file
-        filename = secure_filename(file.filename)
-        unique_filename = str(uuid.uuid4()) + "_" + filename
-        save_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-        file.save(save_path)
-        
-        uploaded_image_url = f'/static/uploads/{unique_filename}'
-        
-        # AI Prediction
-        image = Image.open(save_path)
-        processed_image = prepare_image(image)
-        
-        if model:
-            preds = model.predict(processed_image)
-            decoded_preds = decode_predictions(preds, top=3)[0]
-            ai_category_prediction = decoded_preds[0][1].replace('_', ' ').title()
-            confidence = decoded_preds[0][2]
-        else:
-            ai_category_prediction = "Unknown"
-            confidence = 0
-        
-        # Find matches
-        matches = []
-        for product in PRODUCT_DATABASE:
-            p_cat = product['category'].lower()
-            cat_match = (ai_category_prediction.lower() in p_cat) or (p_cat in ai_category_prediction.lower())
-            
-            key_match = False
-            if keywords:
-                target_str = f"{product['name']} {product['brand']} {product['category']}".lower()
-                key_words = keywords.split()
-                for word in key_words:
-                    if word and word in target_str:
-                        key_match = True
-                        break
-            
-            if keywords:
-                if key_match:
-                    matches.append(product)
-            else:
-                if cat_match:
-                    matches.append(product)
-        
-        # Sort by price
-        if matches:
-            matches.sort(key=lambda x: x['price'])
-            global_best_price = matches[0]['price']
-        else:
-            global_best_price = None
-        
-        # Log search activity
-        log_activity(session['user_email'], 'SEARCH', 
-                    f'Found {len(matches)} products for "{ai_category_prediction}"')
-        
-        # Update user search history
-        users = load_users()
-        if session['user_email'] in users:
-            if 'searches' not in users[session['user_email']]:
-                users[session['user_email']]['searches'] = []
-            users[session['user_email']]['searches'].append({
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'category': ai_category_prediction,
-                'keywords': keywords,
-                'matches_count': len(matches),
-                'image': unique_filename
-            })
-            # Keep only last 50 searches
-            users[session['user_email']]['searches'] = users[session['user_email']]['searches'][-50:]
-            save_users(users)
-        
-        flash(f'Found {len(matches)} matching products', 'success')
-        
-        # Convert matches to string for URL
-        matches_str = str(matches).replace("'", '"')  # Replace single quotes with double quotes for JSON
-        
-        return redirect(f'/?prediction={ai_category_prediction}&matches={matches_str}&uploaded_image_url={uploaded_image_url}&global_best_price={global_best_price}')
-    
-    except Exception as e:
-        flash(f'Error processing image: {str(e)}', 'danger')
-        log_activity(session.get('user_email', 'anonymous'), 'ERROR', f'Image processing failed: {str(e)}')
-        return redirect(url_for('index'))
-
-# ==========================================
-# 9. OTHER ROUTES
-# ==========================================
-
-@app.route('/reload_csv')
-@login_required
-def reload_csv():
-    """Reload product database"""
-    global PRODUCT_DATABASE, CSV_FILES
-    PRODUCT_DATABASE = load_product_database()
-    CSV_FILES = [f for f in os.listdir(DATASETS_FOLDER) if f.endswith('.csv')]
-    
-    log_activity(session['user_email'], 'RELOAD_DB', 
-                f'Loaded {len(PRODUCT_DATABASE)} products from {len(CSV_FILES)} files')
-    
-    flash(f'✅ Database reloaded! {len(PRODUCT_DATABASE)} products from {len(CSV_FILES)} stores', 'success')
-    return redirect(url_for('index'))
-
-@app.route('/profile')
-@login_required
-def profile():
-    """User profile page"""
-    users = load_users()
-    user_data = users.get(session['user_email'], {})
+                handleFileUpload(fileInput);
+            }
+        });
+    }
     
-    # Calculate statistics
-    total_searches = len(user_data.get('searches', []))
-    if total_searches > 0:
-        recent_searches = user_data['searches'][-5:][::-1]
-        avg_matches = sum(s.get('matches_count', 0) for s in user_data['searches']) / total_searches
-    else:
-        recent_searches = []
-        avg_matches = 0
+    // Simulate upload progress
+    function simulateUploadProgress() {
+        const progressBar = document.getElementById('progressBar');
+        const progressContainer = document.getElementById('uploadProgress');
+        let width = 0;
+        
+        progressContainer.style.display = 'block';
+        
+        const interval = setInterval(() => {
+            if (width >= 100) {
+                clearInterval(interval);
+                setTimeout(() => {
+                    progressContainer.style.display = 'none';
+                    progressBar.style.width = '0%';
+                }, 500);
+            } else {
+                width += 10;
+                progressBar.style.width = width + '%';
+            }
+        }, 200);
+    }
     
-    template = BASE_TEMPLATE.replace('{% block main_content %}{% endblock %}', '''
+    // Auto-complete for keywords
+    const keywordsInput = document.getElementById('keywordsInput');
+    if (keywordsInput) {
+        keywordsInput.addEventListener('input', function(e) {
+            console.log('Searching for:', e.target.value);
+        });
+    }
+</script>
+{% endblock %}
+'''
+
+PROFILE_TEMPLATE = '''
+{% extends "base.html" %}
 {% block main_content %}
 <!-- Navbar -->
 <nav class="navbar navbar-expand-lg navbar-dark fixed-top" style="background: rgba(30, 41, 59, 0.95); backdrop-filter: blur(10px);">
@@ -1971,9 +2104,9 @@ def profile():
                 <div class="dropdown">
                     <a href="#" class="nav-link dropdown-toggle d-flex align-items-center" data-bs-toggle="dropdown">
                         <div class="user-avatar me-2" style="width: 32px; height: 32px; background: linear-gradient(135deg, #6366f1, #10b981); border-radius: 50%; display: flex; align-items: center; justify-content: center; color: white; font-weight: 600;">
-                            ''' + (session.get('user_name', 'U')[0].upper() if session.get('user_name') else 'U') + '''
+                            {{ user.username[0]|upper if user.username else 'U' }}
                         </div>
-                        ''' + (session.get('user_name', 'User') if session.get('user_name') else 'User') + '''
+                        {{ user.username or 'User' }}
                     </a>
                     <ul class="dropdown-menu dropdown-menu-end">
                         <li>
@@ -2007,27 +2140,27 @@ def profile():
                 <div class="text-center mb-4">
                     <div class="user-avatar mx-auto mb-3" 
                          style="width: 120px; height: 120px; background: linear-gradient(135deg, #6366f1, #10b981); border-radius: 50%; display: flex; align-items: center; justify-content: center; color: white; font-size: 3rem; font-weight: 700;">
-                        ''' + (user_data.get('full_name', 'User')[0].upper() if user_data.get('full_name') else 'U') + '''
+                        {{ user.full_name[0]|upper if user.full_name else 'U' }}
                     </div>
-                    <h4 class="mb-1">''' + (user_data.get('full_name', 'User') if user_data.get('full_name') else 'User') + '''</h4>
-                    <p class="text-muted mb-2">@''' + (user_data.get('username', 'user') if user_data.get('username') else 'user') + '''</p>
-                    <span class="badge ''' + ('bg-danger' if session.get('role') == 'admin' else 'bg-primary') + ''' bg-gradient p-2">
-                        ''' + (session.get('role', 'user').title() if session.get('role') else 'User') + '''
+                    <h4 class="mb-1">{{ user.full_name or 'User' }}</h4>
+                    <p class="text-muted mb-2">@{{ user.username or 'user' }}</p>
+                    <span class="badge {{ 'bg-danger' if user.role == 'admin' else 'bg-primary' }} bg-gradient p-2">
+                        {{ user.role|title if user.role else 'User' }}
                     </span>
                 </div>
                 
                 <div class="list-group list-group-flush">
                     <div class="list-group-item d-flex justify-content-between align-items-center">
                         <span><i class="bi bi-envelope me-2"></i>Email</span>
-                        <span class="text-muted">''' + (session.get('user_email', 'No email') if session.get('user_email') else 'No email') + '''</span>
+                        <span class="text-muted">{{ email or 'No email' }}</span>
                     </div>
                     <div class="list-group-item d-flex justify-content-between align-items-center">
                         <span><i class="bi bi-calendar me-2"></i>Member Since</span>
-                        <span class="text-muted">''' + (user_data.get('created_at', 'N/A')[:10] if user_data.get('created_at') else 'N/A') + '''</span>
+                        <span class="text-muted">{{ user.created_at[:10] if user.created_at else 'N/A' }}</span>
                     </div>
                     <div class="list-group-item d-flex justify-content-between align-items-center">
                         <span><i class="bi bi-clock-history me-2"></i>Last Login</span>
-                        <span class="text-muted">''' + (user_data.get('last_login', 'Never')[:16] if user_data.get('last_login') else 'Never') + '''</span>
+                        <span class="text-muted">{{ user.last_login[:16] if user.last_login else 'Never' }}</span>
                     </div>
                 </div>
             </div>
@@ -2039,21 +2172,21 @@ def profile():
                 <div class="col-md-4 mb-3">
                     <div class="stats-card">
                         <i class="bi bi-search display-6 mb-3"></i>
-                        <span class="stats-number">''' + str(total_searches) + '''</span>
+                        <span class="stats-number">{{ total_searches }}</span>
                         <p class="mb-0">Total Searches</p>
                     </div>
                 </div>
                 <div class="col-md-4 mb-3">
                     <div class="stats-card">
                         <i class="bi bi-graph-up display-6 mb-3"></i>
-                        <span class="stats-number">''' + f"{avg_matches:.1f}" + '''</span>
+                        <span class="stats-number">{{ '%.1f'|format(avg_matches) }}</span>
                         <p class="mb-0">Avg. Matches</p>
                     </div>
                 </div>
                 <div class="col-md-4 mb-3">
                     <div class="stats-card">
                         <i class="bi bi-star display-6 mb-3"></i>
-                        <span class="stats-number">''' + str(user_data.get('uploads_count', 0)) + '''</span>
+                        <span class="stats-number">{{ uploads_count }}</span>
                         <p class="mb-0">Uploads</p>
                     </div>
                 </div>
@@ -2065,7 +2198,7 @@ def profile():
                     <i class="bi bi-activity me-2"></i>Recent Activity
                 </h5>
                 
-                ''' + ('''
+                {% if recent_searches %}
                 <div class="table-responsive">
                     <table class="table table-hover">
                         <thead>
@@ -2077,15 +2210,15 @@ def profile():
                             </tr>
                         </thead>
                         <tbody>
-                ''' + ''.join([f'''
+                            {% for search in recent_searches %}
                             <tr>
-                                <td>{search.get("timestamp", "")[:10]}</td>
+                                <td>{{ search.get("timestamp", "")[:10] }}</td>
                                 <td>
-                                    <div class="fw-bold">{search.get("category", "")}</div>
-                                    <small class="text-muted">{search.get("keywords", "No keywords")}</small>
+                                    <div class="fw-bold">{{ search.get("category", "") }}</div>
+                                    <small class="text-muted">{{ search.get("keywords", "No keywords") }}</small>
                                 </td>
                                 <td>
-                                    <span class="badge bg-primary">{search.get("matches_count", 0)}</span>
+                                    <span class="badge bg-primary">{{ search.get("matches_count", 0) }}</span>
                                 </td>
                                 <td>
                                     <a href="/my-searches" class="btn btn-sm btn-outline-primary">
@@ -2093,11 +2226,11 @@ def profile():
                                     </a>
                                 </td>
                             </tr>
-                ''' for search in recent_searches]) + '''
+                            {% endfor %}
                         </tbody>
                     </table>
                 </div>
-                ''' if recent_searches else '''
+                {% else %}
                 <div class="text-center py-5">
                     <i class="bi bi-search display-1 text-muted mb-3"></i>
                     <h5>No search history yet</h5>
@@ -2106,7 +2239,7 @@ def profile():
                         <i class="bi bi-search me-2"></i>Start Searching
                     </a>
                 </div>
-                ''') + '''
+                {% endif %}
             </div>
         </div>
     </div>
@@ -2157,19 +2290,10 @@ def profile():
     </div>
 </footer>
 {% endblock %}
-''')
-    
-    return render_template_string(template)
+'''
 
-@app.route('/my-searches')
-@login_required
-def my_searches():
-    """User's search history"""
-    users = load_users()
-    user_data = users.get(session['user_email'], {})
-    searches = user_data.get('searches', [])
-    
-    template = BASE_TEMPLATE.replace('{% block main_content %}{% endblock %}', '''
+MY_SEARCHES_TEMPLATE = '''
+{% extends "base.html" %}
 {% block main_content %}
 <!-- Navbar -->
 <nav class="navbar navbar-expand-lg navbar-dark fixed-top" style="background: rgba(30, 41, 59, 0.95); backdrop-filter: blur(10px);">
@@ -2213,9 +2337,9 @@ def my_searches():
                 <div class="dropdown">
                     <a href="#" class="nav-link dropdown-toggle d-flex align-items-center" data-bs-toggle="dropdown">
                         <div class="user-avatar me-2" style="width: 32px; height: 32px; background: linear-gradient(135deg, #6366f1, #10b981); border-radius: 50%; display: flex; align-items: center; justify-content: center; color: white; font-weight: 600;">
-                            ''' + (session.get('user_name', 'U')[0].upper() if session.get('user_name') else 'U') + '''
+                            {{ user_name[0]|upper if user_name else 'U' }}
                         </div>
-                        ''' + (session.get('user_name', 'User') if session.get('user_name') else 'User') + '''
+                        {{ user_name or 'User' }}
                     </a>
                     <ul class="dropdown-menu dropdown-menu-end">
                         <li>
@@ -2245,7 +2369,7 @@ def my_searches():
     <div class="upload-container">
         <h3 class="mb-4"><i class="bi bi-clock-history me-2"></i>My Search History</h3>
         
-        ''' + ('''
+        {% if searches %}
         <div class="table-responsive">
             <table class="table table-hover">
                 <thead>
@@ -2258,25 +2382,25 @@ def my_searches():
                     </tr>
                 </thead>
                 <tbody>
-        ''' + ''.join([f'''
+                    {% for search in searches|reverse %}
                     <tr>
-                        <td>{search.get("timestamp", "")}</td>
+                        <td>{{ search.get("timestamp", "") }}</td>
                         <td>
-                            <span class="badge bg-primary">{search.get("category", "")}</span>
+                            <span class="badge bg-primary">{{ search.get("category", "") }}</span>
                         </td>
-                        <td>{search.get("keywords", "None")}</td>
-                        <td>{search.get("matches_count", 0)} products</td>
+                        <td>{{ search.get("keywords", "None") }}</td>
+                        <td>{{ search.get("matches_count", 0) }} products</td>
                         <td>
                             <a href="/#upload" class="btn btn-sm btn-outline-primary">
                                 <i class="bi bi-arrow-repeat"></i> Search Again
                             </a>
                         </td>
                     </tr>
-        ''' for search in searches[::-1]]) + '''
+                    {% endfor %}
                 </tbody>
             </table>
         </div>
-        ''' if searches else '''
+        {% else %}
         <div class="text-center py-5">
             <i class="bi bi-search display-1 text-muted mb-3"></i>
             <h5>No search history yet</h5>
@@ -2285,7 +2409,7 @@ def my_searches():
                 <i class="bi bi-search me-2"></i>Start Searching
             </a>
         </div>
-        ''') + '''
+        {% endif %}
     </div>
 </div>
 
@@ -2306,19 +2430,9 @@ def my_searches():
     </div>
 </footer>
 {% endblock %}
-''')
-    
-    return render_template_string(template)
-
-# ==========================================
-# 10. ADMIN ROUTES (Simplified for now)
-# ==========================================
+'''
 
-@app.route('/admin/dashboard')
-@admin_required
-def admin_dashboard():
-    """Admin dashboard - simplified"""
-    return render_template_string('''
+ADMIN_DASHBOARD_TEMPLATE = '''
 <!DOCTYPE html>
 <html>
 <head>
@@ -2330,7 +2444,386 @@ def admin_dashboard():
     <a href="/">Back to Home</a>
 </body>
 </html>
-''')
+'''
+
+# Register the page templates by name so pages can {% extends %} them and
+# render_template() compiles each one once and keeps it in Jinja's template cache
+app.jinja_loader = ChoiceLoader([
+    DictLoader({
+        'base.html': BASE_TEMPLATE,
+        'register.html': REGISTER_TEMPLATE,
+        'login.html': LOGIN_TEMPLATE,
+        'index.html': INDEX_TEMPLATE,
+        'profile.html': PROFILE_TEMPLATE,
+        'my_searches.html': MY_SEARCHES_TEMPLATE,
+        'admin_dashboard.html': ADMIN_DASHBOARD_TEMPLATE
+    }),
+    FileSystemLoader(os.path.join(app.root_path, 'templates'))
+])
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache()
+
+# Pages without per-request content, rendered and compressed once per process
+_STATIC_PAGES = {}
+
+def static_page(name, **context):
+    """Serve a template with no per-request content, pre-compressed (br/gzip).
+    The page is re-rendered only when the context differs from the cached render,
+    and browsers revalidating an unchanged page get a bodiless 304."""
+    cached_context, etag, variants = _STATIC_PAGES.get(name, (None, None, None))
+    if variants is None or cached_context != context:
+        html = render_template(name, **context).encode('utf-8')
+        etag = hashlib.blake2b(html, digest_size=8).hexdigest()
+        variants = {'identity': html, 'gzip': gzip.compress(html, 9)}
+        if brotli:
+            variants['br'] = brotli.compress(html, quality=11)
+        _STATIC_PAGES[name] = (context, etag, variants)
+
+    encoding = request.accept_encodings.best_match([e for e in ('br', 'gzip') if e in variants]) or 'identity'
+    response = Response(variants[encoding], mimetype='text/html')
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    # Weak: the same validator covers every encoding of the page
+    response.set_etag(etag, weak=True)
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+# ==========================================
+# 6. ROUTES - AUTHENTICATION
+# ==========================================
+
+@app.route('/register', methods=['GET', 'POST'])
+def register():
+    """User registration"""
+    if request.method == 'POST':
+        email = request.form.get('email', '').strip().lower()
+        username = request.form.get('username', '').strip()
+        full_name = request.form.get('full_name', '').strip()
+        password = request.form.get('password', '')
+        confirm_password = request.form.get('confirm_password', '')
+        
+        # Validation
+        if not all([email, username, full_name, password]):
+            flash('All fields are required', 'danger')
+            return redirect(url_for('register'))
+        
+        if not EMAIL_RE.fullmatch(email):
+            flash('Please enter a valid email address', 'danger')
+            return redirect(url_for('register'))
+        
+        if password != confirm_password:
+            flash('Passwords do not match', 'danger')
+            return redirect(url_for('register'))
+        
+        if len(password) < 6:
+            flash('Password must be at least 6 characters', 'danger')
+            return redirect(url_for('register'))
+        
+        # Create new user (the primary key rejects duplicate emails)
+        created = create_user(email, {
+            'username': username,
+            'password': _HASH_POOL.submit(hash_password, password).result(),
+            'full_name': full_name,
+            'role': 'user',
+            'created_at': timestamp(),
+            'last_login': None
+        })
+        
+        if not created:
+            flash('Email already registered', 'danger')
+            return redirect(url_for('register'))
+        
+        # Log activity
+        log_activity(email, 'REGISTER', f'New user: {username}')
+        
+        flash('Registration successful! Please login', 'success')
+        return redirect(url_for('login'))
+    
+    # GET request - show registration form (only flashed messages make it vary)
+    if session.get('_flashes'):
+        return render_template('register.html')
+    return static_page('register.html')
+
+@app.route('/login', methods=['GET', 'POST'])
+def login():
+    """User login"""
+    if request.method == 'POST':
+        email = request.form.get('email', '').strip().lower()
+        password = request.form.get('password', '')
+        
+        # Validation
+        if not email or not password:
+            flash('Email and password are required', 'danger')
+            return redirect(url_for('login'))
+        
+        # No account can have a malformed email, so skip the lookup and hash
+        if not EMAIL_RE.fullmatch(email):
+            flash('Invalid email or password', 'danger')
+            return redirect(url_for('login'))
+        
+        # Rate limit before the (deliberately slow) password hash
+        ip_allowed = take_token(f'login:ip:{request.remote_addr}')
+        email_allowed = take_token(f'login:email:{email}')
+        if not (ip_allowed and email_allowed):
+            log_activity(email, 'LOGIN_THROTTLED', f'Too many attempts from {request.remote_addr}')
+            return Response('Too many login attempts. Please try again in a minute.', 429,
+                            {'Retry-After': str(int(1 / LOGIN_RATE))})
+        
+        # Load user
+        user = get_user(email)
+        
+        # Verify password (against a decoy hash for unknown emails, so timing
+        # doesn't reveal which emails are registered)
+        password_ok = _HASH_POOL.submit(
+            verify_password, user['password'] if user else _DUMMY_PASSWORD_HASH, password
+        ).result()
+        if not user or not password_ok:
+            flash('Invalid email or password', 'danger')
+            return redirect(url_for('login'))
+        
+        # Upgrade legacy password hashes now that we have the plaintext
+        # (last_login is written from the LOGIN activity entry below)
+        if password_needs_rehash(user['password']):
+            update_user(email, password=_HASH_POOL.submit(hash_password, password).result())
+        
+        # Set session
+        # Only the email is kept in the session; current_user() loads the rest
+        session['user_email'] = email
+        session.permanent = True
+        
+        # Log activity
+        log_activity(email, 'LOGIN', f'Successful login from {request.remote_addr}')
+        
+        flash(f'Welcome back, {user["username"]}!', 'success')
+        
+        # Redirect based on role
+        if user['role'] == 'admin':
+            return redirect(url_for('admin_dashboard'))
+        return redirect(url_for('index'))
+    
+    # GET request - show login form
+    return static_page('login.html')
+
+@app.route('/logout')
+def logout():
+    """User logout"""
+    if 'user_email' in session:
+        log_activity(session['user_email'], 'LOGOUT', 'User logged out')
+        session.clear()
+    flash('You have been logged out', 'info')
+    return redirect(url_for('index'))
+
+# ==========================================
+# 7. MAIN HOME PAGE
+# ==========================================
+
+@app.route('/')
+def index():
+    """Main home page"""
+    # First-time visitors send no session cookie: they cannot be logged in or
+    # have flashed messages, so their requests never look inside the session
+    has_session = app.config['SESSION_COOKIE_NAME'] in request.cookies
+    logged_in = has_session and 'user_email' in session
+    total_users = count_users()
+    
+    # Search results are saved server-side by /process and linked by token
+    token = request.args.get('r')
+    result = get_search_result(token) if token else None
+    
+    catalog = CATALOG
+    
+    # Plain anonymous landing page: only the site counters vary
+    if not logged_in and not result and not (has_session and session.get('_flashes')):
+        response = static_page('index.html', logged_in=False, is_admin=False, user_name=None,
+                               total_users=total_users, product_count=len(catalog.db),
+                               store_count=len(catalog.csv_files))
+        response.vary.add('Cookie')  # not added for us when the session is never read
+        return response
+    
+    if result is None:
+        result = {'prediction': '', 'image_url': '', 'best_price': None, 'matches': []}
+    matches = result['matches']
+    best_price = result['best_price']
+    
+    # One pass converts each card's numbers and decides its badges,
+    # so the page script only tests flags
+    for m in matches:
+        m['_price'] = to_float(m.get('price'))
+        m['_disc'] = to_float(m.get('discount_percent'))
+        m['_best'] = best_price is not None and m['_price'] == best_price
+        m['_big'] = m['_disc'] > 20
+    
+    user = (current_user() if logged_in else None) or {}
+    return render_template(
+        'index.html',
+        logged_in=logged_in,
+        is_admin=user.get('role') == 'admin',
+        user_name=user.get('username'),
+        total_users=total_users,
+        product_count=len(catalog.db),
+        store_count=len(catalog.csv_files),
+        prediction=result['prediction'],
+        matches=matches,
+        uploaded_image_url=result['image_url']
+    )
+
+# ==========================================
+# 8. PROCESS IMAGE ROUTE
+# ==========================================
+
+@app.route('/process', methods=['POST'])
+@login_required
+def process():
+    """Process image and find matches"""
+    email = session['user_email']
+    if 'file' not in request.files:
+        flash('No file selected', 'danger')
+        return redirect(url_for('index'))
+    
+    file = request.files['file']
+    keywords = request.form.get('keywords', '').lower().strip()
+    
+    if file.filename == '':
+        flash('No file selected', 'danger')
+        return redirect(url_for('index'))
+    
+    try:
+        # Save file
+        filename = secure_filename(file.filename)
+        unique_filename = str(uuid.uuid4()) + "_" + filename
+        save_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
+        file.save(save_path, buffer_size=IO_BUFFER_SIZE)
+        
+        uploaded_image_url = f'/static/uploads/{unique_filename}'
+        
+        # AI Prediction
+        with open(save_path, 'rb', buffering=IO_BUFFER_SIZE) as f:
+            processed_image = prepare_image(Image.open(f))
+        
+        if model:
+            class_id, ai_category_prediction, confidence = predict_image(processed_image)[0]
+        else:
+            class_id = None
+            ai_category_prediction = "Unknown"
+            confidence = 0
+        
+        # Find matches with vectorized column filters, all against one catalogue
+        catalog = CATALOG
+        if keywords:
+            mask = keyword_mask(catalog.search_index, keywords.split())
+        elif class_id is not None:
+            # One gather: this label's category matches, indexed by each row's category code
+            mask = catalog.label_category_map[class_id][catalog.category_codes]
+        else:
+            # No model, so no label id: match the prediction text against each
+            # category with the same substring rule (last entry for code -1)
+            prediction_lc = ai_category_prediction.lower()
+            category_match = np.array(
+                [prediction_lc in str(c) or str(c) in prediction_lc for c in catalog.db['category'].cat.categories]
+                + [False], dtype=bool
+            )
+            mask = category_match[catalog.category_codes]
+        
+        # Sort by price
+        ranked = _rank_by_price(mask, catalog.price_order)
+        matches = product_records(catalog.db.iloc[ranked])
+        global_best_price = matches[0]['price'] if matches else None
+        
+        # Log search activity
+        log_activity(email, 'SEARCH', 
+                    f'Found {len(matches)} products for "{ai_category_prediction}"')
+        
+        # Update upload counter and search history, and save the results page
+        token = record_upload_search(email, {
+            'timestamp': timestamp(),
+            'category': ai_category_prediction,
+            'keywords': keywords,
+            'matches_count': len(matches),
+            'image': unique_filename
+        }, {
+            'prediction': ai_category_prediction,
+            'image_url': uploaded_image_url,
+            'best_price': global_best_price,
+            'matches': matches
+        })
+        
+        flash(f'Found {len(matches)} matching products', 'success')
+        
+        return redirect(url_for('index', r=token))
+    
+    except Exception as e:
+        flash(f'Error processing image: {str(e)}', 'danger')
+        log_activity(email, 'ERROR', f'Image processing failed: {str(e)}')
+        return redirect(url_for('index'))
+
+# ==========================================
+# 9. OTHER ROUTES
+# ==========================================
+
+@app.route('/reload_csv')
+@login_required
+def reload_csv():
+    """Reload product database"""
+    global CATALOG
+    catalog = build_catalog()
+    CATALOG = catalog  # searches in flight keep the catalogue they started with
+    
+    log_activity(session['user_email'], 'RELOAD_DB', 
+                f'Loaded {len(catalog.db)} products from {len(catalog.csv_files)} files')
+    
+    flash(f'✅ Database reloaded! {len(catalog.db)} products from {len(catalog.csv_files)} stores', 'success')
+    return redirect(url_for('index'))
+
+@app.route('/profile')
+@login_required
+def profile():
+    """User profile page"""
+    email = session['user_email']
+    user_data = current_user() or {}
+    searches = get_user_searches(email)
+    uploads_count = get_upload_count(email)
+    
+    # Calculate statistics
+    total_searches = len(searches)
+    if total_searches > 0:
+        recent_searches = searches[-5:][::-1]
+        avg_matches = sum(s.get('matches_count', 0) for s in searches) / total_searches
+    else:
+        recent_searches = []
+        avg_matches = 0
+    
+    return render_template(
+        'profile.html',
+        user=user_data,
+        email=email,
+        total_searches=total_searches,
+        avg_matches=avg_matches,
+        uploads_count=uploads_count,
+        recent_searches=recent_searches
+    )
+
+@app.route('/my-searches')
+@login_required
+def my_searches():
+    """User's search history"""
+    user = current_user() or {}
+    searches = get_user_searches(session['user_email'])
+    
+    return render_template(
+        'my_searches.html',
+        user_name=user.get('username'),
+        searches=searches
+    )
+
+# ==========================================
+# 10. ADMIN ROUTES (Simplified for now)
+# ==========================================
+
+@app.route('/admin/dashboard')
+@admin_required
+def admin_dashboard():
+    """Admin dashboard - simplified"""
+    return render_template('admin_dashboard.html')
 
 # ==========================================
 # 11. MONITOR FUNCTION
@@ -2338,30 +2831,26 @@ def admin_dashboard():
 
 def monitor_console():
     """Display system information in console"""
-    import threading
-    import time
+    # Start from the log file's tail once; after that the listener keeps it current
+    if not RECENT_ACTIVITY:
+        RECENT_ACTIVITY.extend(load_recent_logs(RECENT_ACTIVITY.maxlen))
 
     def monitor():
         while True:
-            os.system('cls' if os.name == 'nt' else 'clear')
+            # ANSI clear screen + cursor home, instead of spawning a cls/clear shell
+            sys.stdout.write('\x1b[2J\x1b[H')
             print("=" * 70)
             print("🛒 EPC - ECOMMERCE PRICE COMPARISON SYSTEM")
             print("=" * 70)
 
-            users = load_users()
-            logs = []
-
-            if os.path.exists(LOGS_FILE):
-                try:
-                    with open(LOGS_FILE, 'r') as f:
-                        logs = json.load(f)
-                except:
-                    pass
+            total_users = count_users()
+            logs = list(RECENT_ACTIVITY)
+            catalog = CATALOG
 
             print(f"\n📊 SYSTEM STATISTICS")
-            print(f"   • Products in Database: {len(PRODUCT_DATABASE)}")
-            print(f"   • CSV Stores: {len(CSV_FILES)}")
-            print(f"   • Registered Users: {len(users)}")
+            print(f"   • Products in Database: {len(catalog.db)}")
+            print(f"   • CSV Stores: {len(catalog.csv_files)}")
+            print(f"   • Registered Users: {total_users}")
             print(f"   • AI Model: {'✅ Loaded' if model else '❌ Not Available'}")
 
             print(f"\n📝 RECENT ACTIVITY (Last 10)")
@@ -2378,7 +2867,7 @@ def monitor_console():
 
             time.sleep(10)
 
-    monitor_thread = threading.Thread(target=monitor)
+    monitor_thread = threading.Thread(target=monitor, daemon=True)
     monitor_thread.start()
 
 # ==========================================
@@ -2391,25 +2880,30 @@ if __name__ == '__main__':
     print("=" * 70)
 
     init_users()
-    users = load_users()
+    total_users = count_users()
 
     print(f"\n✅ SYSTEM READY")
     print(f"   • Admin User: admin@epc.com / admin123")
-    print(f"   • Total Users: {len(users)}")
-    print(f"   • Products Loaded: {len(PRODUCT_DATABASE)}")
-    print(f"   • Stores Found: {len(CSV_FILES)}")
+    print(f"   • Total Users: {total_users}")
+    print(f"   • Products Loaded: {len(CATALOG.db)}")
+    print(f"   • Stores Found: {len(CATALOG.csv_files)}")
     print(f"   • AI Model: {'Loaded' if model else 'Not Available'}")
 
     if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
         monitor_console()
 
+    # The Werkzeug server is for local development only; production runs
+    # gunicorn -c gunicorn_config.py wsgi:application
+    dev = '--dev' in sys.argv[1:]
+
     print("\n🌐 Server starting on http://localhost:5000")
+    if not dev:
+        print("   • Development server: use gunicorn (wsgi:application) in production, --dev for debug mode")
     print("=" * 70)
 
     app.run(
-        debug=True,
+        debug=dev,
         host='0.0.0.0',
         port=5000,
         use_reloader=False
-
     )
@@ -1,178 +1,102 @@
-import pandas as pd
 import os
+import sys
 
 # Create datasets folder if it doesn't exist
 os.makedirs('datasets', exist_ok=True)
 
-# Sample data for Amazon
-amazon_data = {
-    'name': [
-        'Apple iPhone 15 Pro',
-        'Samsung Galaxy S24 Ultra',
-        'Sony WH-1000XM5 Headphones',
-        'Nike Air Max 270',
-        'Dell XPS 15 Laptop',
-        'Kindle Paperwhite',
-        'Apple Watch Series 9',
-        'Bose QuietComfort 45',
-        'Logitech MX Master 3S',
-        'Canon EOS R50 Camera'
-    ],
-    'category': [
-        'smartphone',
-        'smartphone',
-        'headphones',
-        'shoes',
-        'laptop',
-        'ebook reader',
-        'smartwatch',
-        'headphones',
-        'mouse',
-        'camera'
-    ],
-    'price': [999.99, 1299.99, 399.99, 150.00, 1499.99, 139.99, 399.00, 329.00, 99.99, 679.00],
-    'brand': [
-        'Apple',
-        'Samsung',
-        'Sony',
-        'Nike',
-        'Dell',
-        'Amazon',
-        'Apple',
-        'Bose',
-        'Logitech',
-        'Canon'
-    ],
-    'rating': [4.8, 4.7, 4.9, 4.6, 4.5, 4.8, 4.7, 4.8, 4.6, 4.4],
-    'stock': ['In Stock'] * 10,
-    'discount_percent': [5, 10, 15, 20, 5, 10, 8, 12, 15, 7],
-    'description': [
-        'Latest iPhone with A17 Pro chip',
-        'Samsung flagship smartphone with S-Pen',
-        'Premium noise cancelling wireless headphones',
-        'Comfortable running shoes with Air cushioning',
-        'Powerful laptop with OLED display',
-        'Waterproof e-reader with adjustable light',
-        'Advanced smartwatch with health monitoring',
-        'Noise cancelling headphones with premium sound',
-        'Wireless mouse with ergonomic design',
-        'Mirrorless camera for photography enthusiasts'
-    ],
-    'model_id': [
-        'IP15PRO256',
-        'SGS24U512',
-        'WH1000XM5',
-        'AIRMAX270',
-        'XPS159530',
-        'KINDLEPW11',
-        'AWS945MM',
-        'BOSEQC45',
-        'MXM3S',
-        'EOSR50KIT'
-    ],
-    'url': [
-        'https://www.amazon.com/dp/B0CHX1W1ZY',
-        'https://www.amazon.com/dp/B0CM59T1SX',
-        'https://www.amazon.com/dp/B09XS7JWHH',
-        'https://www.amazon.com/dp/B07B3QGW8N',
-        'https://www.amazon.com/dp/B0CJHQDZ2P',
-        'https://www.amazon.com/dp/B09SWDBZQ4',
-        'https://www.amazon.com/dp/B0CHWJQ85L',
-        'https://www.amazon.com/dp/B098FKXT8L',
-        'https://www.amazon.com/dp/B09HMK8M2P',
-        'https://www.amazon.com/dp/B0BV8MPP4Q'
-    ]
-}
+# Columns of every store file
+HEADER = ('name', 'category', 'price', 'brand', 'rating', 'stock',
+          'discount_percent', 'description', 'model_id', 'url')
+
+# Sample data for Amazon, one tuple per product in HEADER order (all-constant
+# tuples, so the compiler stores each table as a single constant)
+AMAZON_ROWS = (
+    ('Apple iPhone 15 Pro', 'smartphone', 999.99, 'Apple', 4.8, 'In Stock', 5,
+     'Latest iPhone with A17 Pro chip', 'IP15PRO256', 'https://www.amazon.com/dp/B0CHX1W1ZY'),
+    ('Samsung Galaxy S24 Ultra', 'smartphone', 1299.99, 'Samsung', 4.7, 'In Stock', 10,
+     'Samsung flagship smartphone with S-Pen', 'SGS24U512', 'https://www.amazon.com/dp/B0CM59T1SX'),
+    ('Sony WH-1000XM5 Headphones', 'headphones', 399.99, 'Sony', 4.9, 'In Stock', 15,
+     'Premium noise cancelling wireless headphones', 'WH1000XM5', 'https://www.amazon.com/dp/B09XS7JWHH'),
+    ('Nike Air Max 270', 'shoes', 150.00, 'Nike', 4.6, 'In Stock', 20,
+     'Comfortable running shoes with Air cushioning', 'AIRMAX270', 'https://www.amazon.com/dp/B07B3QGW8N'),
+    ('Dell XPS 15 Laptop', 'laptop', 1499.99, 'Dell', 4.5, 'In Stock', 5,
+     'Powerful laptop with OLED display', 'XPS159530', 'https://www.amazon.com/dp/B0CJHQDZ2P'),
+    ('Kindle Paperwhite', 'ebook reader', 139.99, 'Amazon', 4.8, 'In Stock', 10,
+     'Waterproof e-reader with adjustable light', 'KINDLEPW11', 'https://www.amazon.com/dp/B09SWDBZQ4'),
+    ('Apple Watch Series 9', 'smartwatch', 399.00, 'Apple', 4.7, 'In Stock', 8,
+     'Advanced smartwatch with health monitoring', 'AWS945MM', 'https://www.amazon.com/dp/B0CHWJQ85L'),
+    ('Bose QuietComfort 45', 'headphones', 329.00, 'Bose', 4.8, 'In Stock', 12,
+     'Noise cancelling headphones with premium sound', 'BOSEQC45', 'https://www.amazon.com/dp/B098FKXT8L'),
+    ('Logitech MX Master 3S', 'mouse', 99.99, 'Logitech', 4.6, 'In Stock', 15,
+     'Wireless mouse with ergonomic design', 'MXM3S', 'https://www.amazon.com/dp/B09HMK8M2P'),
+    ('Canon EOS R50 Camera', 'camera', 679.00, 'Canon', 4.4, 'In Stock', 7,
+     'Mirrorless camera for photography enthusiasts', 'EOSR50KIT', 'https://www.amazon.com/dp/B0BV8MPP4Q')
+)
+
+# Sample data for Flipkart, one tuple per product in HEADER order
+FLIPKART_ROWS = (
+    ('OnePlus 12', 'smartphone', 849.99, 'OnePlus', 4.6, 'In Stock', 12,
+     'Flagship killer smartphone', 'OP12PRO', 'https://www.flipkart.com/oneplus-12'),
+    ('MacBook Air M2', 'laptop', 1099.99, 'Apple', 4.8, 'In Stock', 8,
+     'Lightweight laptop with Apple Silicon', 'MBAM2', 'https://www.flipkart.com/macbook-air-m2'),
+    ('JBL Flip 6 Speaker', 'speaker', 129.99, 'JBL', 4.7, 'In Stock', 20,
+     'Portable Bluetooth speaker', 'JBLFLIP6', 'https://www.flipkart.com/jbl-flip-6'),
+    ('Adidas Ultraboost 22', 'shoes', 180.00, 'Adidas', 4.5, 'In Stock', 15,
+     'Running shoes with Boost technology', 'UBOOST22', 'https://www.flipkart.com/adidas-ultraboost'),
+    ('LG OLED C3 TV', 'television', 1499.00, 'LG', 4.9, 'In Stock', 10,
+     '4K OLED smart TV', 'OLED55C3', 'https://www.flipkart.com/lg-oled-c3'),
+    ('GoPro HERO12', 'camera', 399.99, 'GoPro', 4.6, 'In Stock', 5,
+     'Action camera for adventures', 'HERO12', 'https://www.flipkart.com/gopro-hero12'),
+    ('Microsoft Surface Pro 9', 'tablet', 999.99, 'Microsoft', 4.5, 'In Stock', 12,
+     '2-in-1 laptop and tablet', 'SPRO9', 'https://www.flipkart.com/surface-pro-9'),
+    ('Fitbit Charge 6', 'fitness tracker', 159.99, 'Fitbit', 4.4, 'In Stock', 18,
+     'Advanced fitness and health tracker', 'FITCHG6', 'https://www.flipkart.com/fitbit-charge-6'),
+    ('Philips Sonicare Toothbrush', 'personal care', 89.99, 'Philips', 4.7, 'In Stock', 10,
+     'Electric toothbrush with smart features', 'SONIC9900', 'https://www.flipkart.com/philips-sonicare'),
+    ('Instant Pot Duo', 'kitchen appliance', 79.99, 'Instant Pot', 4.8, 'In Stock', 25,
+     'Multi-functional pressure cooker', 'IPDUO7', 'https://www.flipkart.com/instant-pot-duo')
+)
+
+# Column order and types are fixed, so every row is rendered by one template
+ROW_TEMPLATE = '{},{},{:.2f},{},{:.1f},{},{:d},{},{},{}\n'
+
+def _quote(value):
+    """CSV-quote text containing a comma, quote or newline; anything else passes through"""
+    if isinstance(value, str) and (',' in value or '"' in value or '\n' in value):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+def render_csv(rows):
+    """Render product tuples through ROW_TEMPLATE as CSV text"""
+    body = ''.join(ROW_TEMPLATE.format(*map(_quote, row)) for row in rows)
+    return ','.join(HEADER) + '\n' + body
 
-# Sample data for Flipkart
-flipkart_data = {
-    'name': [
-        'OnePlus 12',
-        'MacBook Air M2',
-        'JBL Flip 6 Speaker',
-        'Adidas Ultraboost 22',
-        'LG OLED C3 TV',
-        'GoPro HERO12',
-        'Microsoft Surface Pro 9',
-        'Fitbit Charge 6',
-        'Philips Sonicare Toothbrush',
-        'Instant Pot Duo'
-    ],
-    'category': [
-        'smartphone',
-        'laptop',
-        'speaker',
-        'shoes',
-        'television',
-        'camera',
-        'tablet',
-        'fitness tracker',
-        'personal care',
-        'kitchen appliance'
-    ],
-    'price': [849.99, 1099.99, 129.99, 180.00, 1499.00, 399.99, 999.99, 159.99, 89.99, 79.99],
-    'brand': [
-        'OnePlus',
-        'Apple',
-        'JBL',
-        'Adidas',
-        'LG',
-        'GoPro',
-        'Microsoft',
-        'Fitbit',
-        'Philips',
-        'Instant Pot'
-    ],
-    'rating': [4.6, 4.8, 4.7, 4.5, 4.9, 4.6, 4.5, 4.4, 4.7, 4.8],
-    'stock': ['In Stock'] * 10,
-    'discount_percent': [12, 8, 20, 15, 10, 5, 12, 18, 10, 25],
-    'description': [
-        'Flagship killer smartphone',
-        'Lightweight laptop with Apple Silicon',
-        'Portable Bluetooth speaker',
-        'Running shoes with Boost technology',
-        '4K OLED smart TV',
-        'Action camera for adventures',
-        '2-in-1 laptop and tablet',
-        'Advanced fitness and health tracker',
-        'Electric toothbrush with smart features',
-        'Multi-functional pressure cooker'
-    ],
-    'model_id': [
-        'OP12PRO',
-        'MBAM2',
-        'JBLFLIP6',
-        'UBOOST22',
-        'OLED55C3',
-        'HERO12',
-        'SPRO9',
-        'FITCHG6',
-        'SONIC9900',
-        'IPDUO7'
-    ],
-    'url': [
-        'https://www.flipkart.com/oneplus-12',
-        'https://www.flipkart.com/macbook-air-m2',
-        'https://www.flipkart.com/jbl-flip-6',
-        'https://www.flipkart.com/adidas-ultraboost',
-        'https://www.flipkart.com/lg-oled-c3',
-        'https://www.flipkart.com/gopro-hero12',
-        'https://www.flipkart.com/surface-pro-9',
-        'https://www.flipkart.com/fitbit-charge-6',
-        'https://www.flipkart.com/philips-sonicare',
-        'https://www.flipkart.com/instant-pot-duo'
-    ]
+# Sample rows per store; each store is written to datasets/<store>.csv
+STORES = {
+    'amazon': AMAZON_ROWS,
+    'flipkart': FLIPKART_ROWS,
 }
 
-# Create DataFrames
-df_amazon = pd.DataFrame(amazon_data)
-df_flipkart = pd.DataFrame(flipkart_data)
+def is_current(path, text):
+    """True if the file already holds exactly text"""
+    try:
+        with open(path, newline='', encoding='utf-8') as f:
+            return f.read() == text
+    except FileNotFoundError:
+        return False
 
-# Save to CSV
-df_amazon.to_csv('datasets/amazon.csv', index=False)
-df_flipkart.to_csv('datasets/flipkart.csv', index=False)
+# Render every file first, then write them back to back with no work in between
+outputs = {os.path.join('datasets', f'{store}.csv'): render_csv(rows) for store, rows in STORES.items()}
+for path, text in outputs.items():
+    # Reruns leave unchanged files (and their mtimes) alone
+    if is_current(path, text):
+        continue
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        f.write(text)
 
-print("✅ Sample data created successfully!")
-print(f"📊 Amazon: {len(df_amazon)} products")
-print(f"📊 Flipkart: {len(df_flipkart)} products")
-print(f"💾 Files saved in 'datasets/' folder")
\ No newline at end of file
+# One write for the whole summary
+sys.stdout.write(
+    "✅ Sample data created successfully!\n"
+    + ''.join(f"📊 {store.title()}: {len(rows)} products\n" for store, rows in STORES.items())
+    + "💾 Files saved in 'datasets/' folder\n"
+)
\ No newline at end of file
@@ -0,0 +1,34 @@
+# Gunicorn settings for serving the EPC app in production
+# Run with: gunicorn -c gunicorn_config.py wsgi:application
+import os
+
+bind = "0.0.0.0:5000"
+
+# Few heavy workers with many threads: every worker loads its own TensorFlow
+# model, inference batcher and hash pool, so extra processes only duplicate the
+# model and thin out batches. Threads wait on the in-process batcher (more
+# concurrent uploads per process form bigger batches) while the others keep
+# serving pages and auth requests.
+# Exported so app.py sizes its TF and hash pools to each worker's share of the CPUs
+os.environ.setdefault("WEB_CONCURRENCY", "2")
+worker_class = "gthread"
+workers = int(os.environ["WEB_CONCURRENCY"])
+threads = int(os.environ.get("GUNICORN_THREADS", 16))
+timeout = 60
+
+# TensorFlow's runtime is not fork-safe: a model loaded in the master hangs
+# in forked workers, so every worker imports app.py (and MobileNetV2) itself
+preload_app = False
+
+# Activity log: workers only ever append to logs.jsonl and reopen it once it
+# has been moved away, so rotation belongs to logrotate. Drop this into
+# /etc/logrotate.d/epc (with the app's real path); no copytruncate needed:
+#
+#   /srv/epc/logs.jsonl {
+#       size 10M
+#       rotate 5
+#       compress
+#       delaycompress
+#       missingok
+#       notifempty
+#   }
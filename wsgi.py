@@ -0,0 +1,8 @@
+# WSGI entrypoint for production servers
+# Run with: gunicorn -c gunicorn_config.py wsgi:application
+from app import app, init_users
+
+# app.py's __main__ block doesn't run under gunicorn, so seed the admin user here
+init_users()
+
+application = app